@@ -1,75 +1,122 @@
 """
 DCA Question States and Management Module
 """
-from typing import Dict, List, Optional
-import json
-
-class DCAQuestionState:
-    def __init__(self, scenario: str, question: str, options: List[str], correct: int):
-        self.scenario = scenario
-        self.question = question
-        self.options = options
-        self.correct = correct
-        self.selected_answer: Optional[int] = None
-        self.response_time_ms: Optional[int] = None
-        self.ai_feedback: Optional[str] = None
-        self.ai_confidence: Optional[float] = None
+from dataclasses import dataclass
+import sys
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import orjson
+
+@dataclass(frozen=True, slots=True)
+class DCAQuestion:
+    """Static question content, shared by every assessment session"""
+    scenario: str
+    question: str
+    options: Tuple[str, ...]
+    correct: int
+
+    def __post_init__(self):
+        # Scenario names are used as lookup keys on every evaluation
+        object.__setattr__(self, 'scenario', sys.intern(self.scenario))
+
+# The question bank is fixed: one instance of each question system-wide
+_CANONICAL_QUESTIONS: Tuple[DCAQuestion, ...] = (
+    DCAQuestion(
+        scenario="Initial Response",
+        question="You receive a report of smoke in the forward engine room. What is your first action?",
+        options=(
+            "Sound general quarters",
+            "Notify the bridge",
+            "Send an investigator",
+            "Activate fire suppression"
+        ),
+        correct=1  # Notify the bridge
+    ),
+    DCAQuestion(
+        scenario="Investigation Phase",
+        question="The investigator reports active fire in electrical panel 2B. What is your immediate response?",
+        options=(
+            "Order immediate evacuation",
+            "Direct CO2 release",
+            "Send in fire team with PKP",
+            "Activate sprinkler system"
+        ),
+        correct=2  # Send in fire team with PKP
+    ),
+    # Add more questions as needed
+)
+
+# Answer key for vectorized grading in submit_batch
+_ANSWER_KEY = np.array([q.correct for q in _CANONICAL_QUESTIONS], dtype=np.int8)
 
 class DCAAssessmentManager:
     def __init__(self):
-        self.questions = [
-            DCAQuestionState(
-                scenario="Initial Response",
-                question="You receive a report of smoke in the forward engine room. What is your first action?",
-                options=[
-                    "Sound general quarters",
-                    "Notify the bridge",
-                    "Send an investigator",
-                    "Activate fire suppression"
-                ],
-                correct=1  # Notify the bridge
-            ),
-            DCAQuestionState(
-                scenario="Investigation Phase",
-                question="The investigator reports active fire in electrical panel 2B. What is your immediate response?",
-                options=[
-                    "Order immediate evacuation",
-                    "Direct CO2 release",
-                    "Send in fire team with PKP",
-                    "Activate sprinkler system"
-                ],
-                correct=2  # Send in fire team with PKP
-            ),
-            # Add more questions as needed
-        ]
+        self.questions = _CANONICAL_QUESTIONS
+        self._n = len(self.questions)
+        self._correct = _ANSWER_KEY
+
+        # Per-session answer state, one slot per question (-1 = unanswered);
+        # the response dicts are views built from these and the question bank
+        self.selected_answers = np.full(self._n, -1, dtype=np.int8)
+        self.response_times_ms = np.full(self._n, -1, dtype=np.int64)
+
         self.current_index = 0
         self.score = 0
-        self.responses: List[Dict] = []
 
-    def get_current_question(self) -> Optional[DCAQuestionState]:
-        if 0 <= self.current_index < len(self.questions):
+    def get_current_question(self) -> Optional[DCAQuestion]:
+        if self.current_index < self._n:
             return self.questions[self.current_index]
         return None
 
+    def _response(self, index: int, selected: int, response_time_ms: int) -> Dict:
+        question = self.questions[index]
+        return {
+            'scenario': question.scenario,
+            'question': question.question,
+            'selected': question.options[selected],
+            'correct': selected == question.correct,
+            'response_time_ms': response_time_ms
+        }
+
+    @property
+    def responses(self) -> List[Dict]:
+        """Recorded responses, in question order"""
+        answered = self.current_index
+        return [
+            self._response(i, selected, rt)
+            for i, (selected, rt) in enumerate(zip(
+                self.selected_answers[:answered].tolist(),
+                self.response_times_ms[:answered].tolist()))
+        ]
+
     def submit_answer(self, answer_index: int, response_time_ms: int) -> Dict:
         question = self.get_current_question()
         if question:
-            question.selected_answer = answer_index
-            question.response_time_ms = response_time_ms
+            # Reject a bad index before any session state changes
+            if (not isinstance(answer_index, (int, np.integer))
+                    or isinstance(answer_index, bool)):
+                raise ValueError(f"answer_index must be an integer, got {answer_index!r}")
+            if not 0 <= answer_index < len(question.options):
+                raise ValueError(
+                    f"answer_index {answer_index} out of range for "
+                    f"{len(question.options)} options"
+                )
+            if (not isinstance(response_time_ms, (int, float, np.number))
+                    or isinstance(response_time_ms, bool)
+                    or not np.isfinite(response_time_ms)):
+                raise ValueError(
+                    f"response_time_ms must be a number, got {response_time_ms!r}"
+                )
+            # Stored, and reported back, in whole milliseconds
+            answer_index = int(answer_index)
+            response_time_ms = int(round(response_time_ms))
+            self.selected_answers[self.current_index] = answer_index
+            self.response_times_ms[self.current_index] = response_time_ms
             
-            # Store response data
-            response_data = {
-                'scenario': question.scenario,
-                'question': question.question,
-                'selected': question.options[answer_index],
-                'correct': answer_index == question.correct,
-                'response_time_ms': response_time_ms
-            }
-            self.responses.append(response_data)
+            response_data = self._response(self.current_index, answer_index, response_time_ms)
             
             # Update score
-            if answer_index == question.correct:
-                self.score += 1
+            self.score += response_data['correct']
             
             # Move to next question
             self.current_index += 1
@@ -77,11 +124,51 @@ class DCAAssessmentManager:
             return response_data
         return {}
 
+    def submit_batch(self, selections: np.ndarray,
+                     response_times_ms: np.ndarray) -> List[Dict]:
+        """
+        Submit answers for the next len(selections) questions at once,
+        grading them against the answer key in a single vectorized pass.
+        Intended for bulk replay/grading; the UI uses submit_answer.
+        """
+        selections = np.asarray(selections)
+        response_times_ms = np.asarray(response_times_ms)
+        start = self.current_index
+        end = start + len(selections)
+        if end > self._n:
+            raise ValueError(
+                f"{len(selections)} answers submitted but only "
+                f"{self._n - start} questions remain"
+            )
+        if len(selections) and selections.dtype.kind not in 'iu':
+            raise ValueError("answer indices must be integers")
+        if response_times_ms.shape != selections.shape or (
+                len(selections) and (response_times_ms.dtype.kind not in 'iuf'
+                                     or not np.isfinite(response_times_ms).all())):
+            raise ValueError("one numeric response time is required per answer")
+
+        n_options = np.array([len(q.options) for q in self.questions[start:end]])
+        if ((selections < 0) | (selections >= n_options)).any():
+            raise ValueError("answer index out of range for its question")
+
+        selections = selections.astype(np.int8)
+        is_correct = selections == self._correct[start:end]
+        self.score += int(is_correct.sum())
+        self.selected_answers[start:end] = selections
+        self.response_times_ms[start:end] = np.round(response_times_ms)
+        self.current_index = end
+
+        return [
+            self._response(i, selected, rt)
+            for i, selected, rt in zip(range(start, end), selections.tolist(),
+                                       self.response_times_ms[start:end].tolist())
+        ]
+
     def get_final_results(self) -> Dict:
         return {
-            'total_questions': len(self.questions),
+            'total_questions': self._n,
             'correct_answers': self.score,
-            'percentage': (self.score / len(self.questions)) * 100,
+            'percentage': (self.score / self._n) * 100,
             'responses': self.responses
         }
 
@@ -89,19 +176,22 @@ class DCAAssessmentManager:
         """Save the current session data to a JSON file"""
         session_data = {
             'score': self.score,
-            'total_questions': len(self.questions),
+            'total_questions': self._n,
             'responses': self.responses
         }
-        with open(filepath, 'w') as f:
-            json.dump(session_data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(session_data, option=orjson.OPT_INDENT_2))
 
     @classmethod
     def load_session(cls, filepath: str) -> 'DCAAssessmentManager':
         """Load a session from a JSON file"""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        with open(filepath, 'rb') as f:
+            data = orjson.loads(f.read())
         
         manager = cls()
         manager.score = data['score']
-        manager.responses = data['responses']
+        for i, response in enumerate(data['responses']):
+            manager.selected_answers[i] = manager.questions[i].options.index(response['selected'])
+            manager.response_times_ms[i] = response['response_time_ms']
+        manager.current_index = len(data['responses'])
         return manager
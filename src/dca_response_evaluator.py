@@ -1,41 +1,97 @@
 """
 DCA Response Evaluator using simplified DQN approach
 """
+from bisect import bisect_left
 from typing import Dict, List, Tuple
-import json
 import numpy as np
+import orjson
+
+try:
+    import numba
+    _NUMBA = True
+except ImportError:
+    _NUMBA = False
+
+# Time score for each band: <= excellent, <= good, <= acceptable, slower
+TIME_SCORES = (1.0, 0.8, 0.6, 0.4)
+_TIME_SCORE_ARR = np.array(TIME_SCORES)
+
+
+if _NUMBA:
+    @numba.njit(cache=True)
+    def _score_batch(times, correct, scen, thresholds, time_scores,
+                     weights, safety):
+        """Per-row scoring loop compiled by Numba"""
+        n = times.shape[0]
+        scores = np.empty((n, 3))
+        total = np.empty(n)
+        confidence = np.empty(n)
+        for i in range(n):
+            s = scen[i]
+            band = 0
+            while band < 3 and times[i] > thresholds[s, band]:
+                band += 1
+            a = time_scores[band]
+            b = 1.0 if correct[i] else 0.0
+            c = safety[s, 1] if correct[i] else safety[s, 0]
+            scores[i, 0] = a
+            scores[i, 1] = b
+            scores[i, 2] = c
+            total[i] = weights[s, 0] * a + weights[s, 1] * b + weights[s, 2] * c
+            m = (a + b + c) / 3.0
+            std_dev = (((a - m) ** 2 + (b - m) ** 2 + (c - m) ** 2) / 3.0) ** 0.5
+            conf = 1.0 - std_dev / max(a, b, c)
+            confidence[i] = min(max(conf, 0.0), 1.0)
+        return scores, total, confidence
+else:
+    def _score_batch(times, correct, scen, thresholds, time_scores,
+                     weights, safety):
+        """Vectorized NumPy scoring used when Numba is not installed"""
+        # Row-wise bisect_left: number of cutoffs below each response time
+        band = (times[:, None] > thresholds[scen]).sum(axis=1)
+        scores = np.empty((times.shape[0], 3))
+        scores[:, 0] = time_scores[band]
+        scores[:, 1] = correct
+        scores[:, 2] = safety[scen, correct.astype(np.intp)]
+
+        total = (weights[scen] * scores).sum(axis=1)
+        std_dev = scores.std(axis=1)
+        confidence = np.clip(1 - std_dev / scores.max(axis=1), 0, 1)
+        return scores, total, confidence
 
 
 class SimpleResponseEvaluator:
     def __init__(self):
-        # Define scenario weights and features
-        self.scenario_weights = {
-            "Initial Response": {
-                "speed": 0.4,
-                "protocol": 0.4,
-                "safety": 0.2
-            },
-            "Investigation Phase": {
-                "speed": 0.3,
-                "protocol": 0.3,
-                "safety": 0.4
-            }
-        }
-        
-        # Response time thresholds (ms)
-        self.time_thresholds = {
-            "Initial Response": {
-                "excellent": 3000,
-                "good": 5000,
-                "acceptable": 8000
-            },
-            "Investigation Phase": {
-                "excellent": 4000,
-                "good": 7000,
-                "acceptable": 10000
-            }
+        # Scenario name -> row index into the tables below
+        self._scenario_id = {
+            "Initial Response": 0,
+            "Investigation Phase": 1
         }
 
+        # Scenario weights: speed, protocol, safety
+        self._weights = np.array([
+            [0.4, 0.4, 0.2],  # Initial Response
+            [0.3, 0.3, 0.4]   # Investigation Phase
+        ])
+
+        # Response time thresholds (ms): excellent, good, acceptable
+        self._thresholds = np.array([
+            [3000, 5000, 8000],   # Initial Response
+            [4000, 7000, 10000]   # Investigation Phase
+        ], dtype=np.int32)
+
+        # Safety score per scenario: [incorrect, correct]
+        self._safety = np.array([
+            [self._evaluate_safety(scenario, {"correct": False}),
+             self._evaluate_safety(scenario, {"correct": True})]
+            for scenario in self._scenario_id
+        ])
+
+        # Plain-tuple rows for the scalar path; indexing tiny ndarrays one
+        # element at a time costs more than it saves
+        self._weight_rows = [tuple(row) for row in self._weights.tolist()]
+        self._cutoff_rows = [tuple(row) for row in self._thresholds.tolist()]
+
     def evaluate_response(self, 
                          scenario: str,
                          response_data: Dict,
@@ -43,25 +99,30 @@ class SimpleResponseEvaluator:
         """
         Evaluate a DCA response using our simplified DQN-like approach
         """
+        # Look up the per-scenario rows once
+        sid = self._scenario_id[scenario]
+        w_speed, w_protocol, w_safety = self._weight_rows[sid]
+        cutoffs = self._cutoff_rows[sid]
+
         # Extract features
         time_score = self._evaluate_response_time(
-            scenario, 
+            cutoffs, 
             response_data["response_time_ms"]
         )
         protocol_score = float(response_data["correct"])
         safety_score = self._evaluate_safety(scenario, response_data)
 
         # Calculate weighted score
-        weights = self.scenario_weights[scenario]
         total_score = (
-            weights["speed"] * time_score +
-            weights["protocol"] * protocol_score +
-            weights["safety"] * safety_score
+            w_speed * time_score +
+            w_protocol * protocol_score +
+            w_safety * safety_score
         )
 
         # Generate confidence based on feature agreement
-        scores = [time_score, protocol_score, safety_score]
-        confidence = self._calculate_confidence(scores)
+        confidence = self._calculate_confidence(
+            time_score, protocol_score, safety_score
+        )
 
         # Prepare feedback
         feedback = self._generate_feedback(
@@ -83,19 +144,56 @@ class SimpleResponseEvaluator:
             }
         }
 
-    def _evaluate_response_time(self, scenario: str, 
+    def evaluate_batch(self, responses: List[Dict]) -> List[Dict]:
+        """
+        Evaluate a list of recorded responses (as returned by
+        DCAAssessmentManager.submit_answer) in one vectorized pass.
+        Uses a Numba-compiled kernel when Numba is available; single
+        requests should keep using evaluate_response.
+        """
+        n = len(responses)
+        if not n:
+            return []
+
+        scenario_ids = self._scenario_id
+        scen = np.fromiter((scenario_ids[r["scenario"]] for r in responses),
+                           dtype=np.intp, count=n)
+        times = np.fromiter((r["response_time_ms"] for r in responses),
+                            dtype=np.int32, count=n)
+        correct = np.fromiter((r["correct"] for r in responses),
+                              dtype=np.bool_, count=n)
+
+        scores, total, confidence = _score_batch(
+            times, correct, scen, self._thresholds, _TIME_SCORE_ARR,
+            self._weights, self._safety
+        )
+
+        total_r = np.round(total, 2).tolist()
+        confidence_r = np.round(confidence, 2).tolist()
+        scores_r = np.round(scores, 2).tolist()
+        scores_l = scores.tolist()
+        total_l = total.tolist()
+
+        return [
+            {
+                "score": total_r[i],
+                "confidence": confidence_r[i],
+                "feedback": self._generate_feedback(
+                    r["scenario"], total_l[i], *scores_l[i]
+                ),
+                "details": {
+                    "time_score": scores_r[i][0],
+                    "protocol_score": scores_r[i][1],
+                    "safety_score": scores_r[i][2]
+                }
+            }
+            for i, r in enumerate(responses)
+        ]
+
+    def _evaluate_response_time(self, cutoffs: Tuple[int, int, int], 
                               response_time: int) -> float:
         """Calculate normalized score for response time"""
-        thresholds = self.time_thresholds[scenario]
-        
-        if response_time <= thresholds["excellent"]:
-            return 1.0
-        elif response_time <= thresholds["good"]:
-            return 0.8
-        elif response_time <= thresholds["acceptable"]:
-            return 0.6
-        else:
-            return 0.4
+        return TIME_SCORES[bisect_left(cutoffs, response_time)]
 
     def _evaluate_safety(self, scenario: str, 
                         response_data: Dict) -> float:
@@ -112,14 +210,15 @@ class SimpleResponseEvaluator:
             return 0.6  # Incorrect response may have safety implications
         return 0.7  # Default safety score
 
-    def _calculate_confidence(self, scores: List[float]) -> float:
+    def _calculate_confidence(self, a: float, b: float, c: float) -> float:
         """
         Calculate confidence based on agreement between different scores
         """
-        # Use standard deviation as a measure of score agreement
-        std_dev = np.std(scores)
+        # Use (population) standard deviation as a measure of score agreement
+        m = (a + b + c) / 3.0
+        std_dev = (((a - m) ** 2 + (b - m) ** 2 + (c - m) ** 2) / 3.0) ** 0.5
         # Convert to confidence (1 - normalized std_dev)
-        confidence = 1 - (std_dev / max(scores))
+        confidence = 1 - (std_dev / max(a, b, c))
         return min(max(confidence, 0), 1)  # Clamp between 0 and 1
 
     def _generate_feedback(self, scenario: str, total_score: float,
@@ -154,11 +253,11 @@ class SimpleResponseEvaluator:
 
     def save_evaluation(self, filepath: str, evaluation_data: Dict):
         """Save evaluation results to a JSON file"""
-        with open(filepath, 'w') as f:
-            json.dump(evaluation_data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(evaluation_data, option=orjson.OPT_INDENT_2))
 
     @classmethod
     def load_evaluations(cls, filepath: str) -> List[Dict]:
         """Load previous evaluations from a JSON file"""
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
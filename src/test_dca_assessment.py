@@ -17,6 +17,9 @@ def run_test_session():
     results_dir = "assessment_results"
     os.makedirs(results_dir, exist_ok=True)
     
+    # Evaluations from the main loop, reused when saving
+    evaluations = []
+    
     # Simulate going through questions
     while question := manager.get_current_question():
         print(f"\nScenario: {question.scenario}")
@@ -38,6 +41,7 @@ def run_test_session():
             response,
             {"phase": question.scenario}
         )
+        evaluations.append(evaluation)
         
         print("\nEvaluation:")
         print(f"Score: {evaluation['score']}")
@@ -61,14 +65,7 @@ def run_test_session():
     evaluator.save_evaluation(evals_file, {
         'timestamp': timestamp,
         'results': results,
-        'evaluations': [
-            evaluator.evaluate_response(
-                r['scenario'], 
-                r, 
-                {'phase': r['scenario']}
-            )
-            for r in results['responses']
-        ]
+        'evaluations': evaluations
     })
     
     print(f"\nSession data saved to: {session_file}")
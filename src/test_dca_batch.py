@@ -0,0 +1,134 @@
+"""
+Test script for the batched DCA grading paths
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+from dca_question_states import DCAAssessmentManager
+from dca_response_evaluator import SimpleResponseEvaluator
+
+
+def _answers(manager):
+    """Alternate correct and wrong answers, with varied response times"""
+    selections = []
+    for i, question in enumerate(manager.questions):
+        wrong = (question.correct + 1) % len(question.options)
+        selections.append(question.correct if i % 2 == 0 else wrong)
+    times = [1500 + 2500 * i for i in range(len(selections))]
+    return selections, times
+
+
+def test_submit_batch_matches_submit_answer():
+    """submit_batch grades and records exactly like repeated submit_answer"""
+    single = DCAAssessmentManager()
+    batched = DCAAssessmentManager()
+    selections, times = _answers(single)
+    
+    expected = [single.submit_answer(s, t) for s, t in zip(selections, times)]
+    half = len(selections) // 2
+    got = batched.submit_batch(selections[:half], times[:half])
+    got += batched.submit_batch(selections[half:], times[half:])
+    
+    assert got == expected
+    assert batched.get_final_results() == single.get_final_results()
+    assert batched.get_current_question() is None
+    print("✅ submit_batch matches submit_answer")
+
+
+def test_submit_batch_rejects_bad_input():
+    """An invalid batch raises and leaves the session untouched"""
+    manager = DCAAssessmentManager()
+    n = len(manager.questions)
+    
+    for selections, times in (([0] * (n + 1), [1000] * (n + 1)),
+                              ([99] + [0] * (n - 1), [1000] * n),
+                              ([-1], [1000]), ([1.0], [1000]), ([300], [1000]),
+                              ([0], ['fast']), ([0], [float('nan')]), ([0, 1], [1000])):
+        try:
+            manager.submit_batch(selections, times)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"submit_batch accepted {selections}, {times}")
+    
+    assert manager.current_index == 0
+    assert manager.score == 0
+    assert manager.responses == []
+    print("✅ submit_batch rejects invalid answers without side effects")
+
+
+def test_submit_answer_rejects_bad_input():
+    """A non-integer or out-of-range answer raises before the session changes"""
+    manager = DCAAssessmentManager()
+    
+    for answer, response_time in ((1.0, 1000), (True, 1000), ('1', 1000), (9, 1000),
+                                  (-1, 1000), (1, 'fast'), (1, None), (1, float('inf'))):
+        try:
+            manager.submit_answer(answer, response_time)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"submit_answer accepted {answer!r}, {response_time!r}")
+    
+    assert manager.current_index == 0
+    assert manager.responses == []
+    assert (manager.selected_answers == -1).all()
+    assert manager.submit_answer(np.int64(1), 1500.4)['response_time_ms'] == 1500
+    print("✅ submit_answer rejects invalid answers without side effects")
+
+
+def test_save_and_load_session():
+    """A saved session loads back with the same responses and results"""
+    manager = DCAAssessmentManager()
+    selections, times = _answers(manager)
+    manager.submit_batch(selections, times)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.json")
+        manager.save_session(path)
+        loaded = DCAAssessmentManager.load_session(path)
+    
+    assert loaded.responses == manager.responses
+    assert loaded.get_final_results() == manager.get_final_results()
+    print("✅ Saved sessions load back unchanged")
+
+
+def test_evaluate_batch_matches_evaluate_response():
+    """evaluate_batch returns what evaluate_response returns per response"""
+    manager = DCAAssessmentManager()
+    evaluator = SimpleResponseEvaluator()
+    selections, times = _answers(manager)
+    responses = manager.submit_batch(np.array(selections), np.array(times))
+    
+    expected = [
+        evaluator.evaluate_response(r['scenario'], r, {"phase": r['scenario']})
+        for r in responses
+    ]
+    assert evaluator.evaluate_batch(responses) == expected
+    assert evaluator.evaluate_batch([]) == []
+    print("✅ evaluate_batch matches evaluate_response")
+
+
+def main():
+    """Run every batch test, reporting failures instead of stopping at the first"""
+    tests = [
+        test_submit_batch_matches_submit_answer,
+        test_submit_batch_rejects_bad_input,
+        test_submit_answer_rejects_bad_input,
+        test_save_and_load_session,
+        test_evaluate_batch_matches_evaluate_response
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -8,38 +8,48 @@ import os
 import re
 from pathlib import Path
 
+# Replace the hardcoded API key with environment variable pattern.
+# Patterns are bytes: they only match ASCII, so files are never decoded.
+API_KEY_PATTERN = rb"hf_[A-Za-z0-9_]{30,}"
+PLACEHOLDER_PATTERNS = [
+    # JavaScript patterns
+    (rb"const HF_API_KEY = '[^']*';", b"const HF_API_KEY = process.env.HF_API_KEY || 'YOUR_HUGGING_FACE_TOKEN';"),
+    (rb'const HF_API_KEY = "[^"]*";', b'const HF_API_KEY = process.env.HF_API_KEY || "YOUR_HUGGING_FACE_TOKEN";'),
+    (rb"HF_API_KEY = '[^']*'", b"HF_API_KEY = 'YOUR_HUGGING_FACE_TOKEN'"),
+    (rb'HF_API_KEY = "[^"]*"', b'HF_API_KEY = "YOUR_HUGGING_FACE_TOKEN"'),
+    
+    # Direct API key replacements
+    (API_KEY_PATTERN, b"YOUR_HUGGING_FACE_TOKEN"),
+]
+
+# All patterns fused into one alternation, compiled once at import, so each
+# file is scanned in a single pass. Earlier entries win at the same position.
+_FUSED_PATTERN = re.compile(b"|".join(
+    b"(?P<p%d>%s)" % (i, pattern) for i, (pattern, _) in enumerate(PLACEHOLDER_PATTERNS)
+))
+_REPLACEMENTS = {
+    f"p{i}": replacement for i, (_, replacement) in enumerate(PLACEHOLDER_PATTERNS)
+}
+
+def _replace_match(match):
+    """Pick the replacement for whichever pattern matched"""
+    return _REPLACEMENTS[match.lastgroup]
+
 def sanitize_file(file_path):
     """Remove API keys from a file and replace with environment variable pattern"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = file_path.read_bytes()
         
         original_content = content
         
-        # Replace the hardcoded API key with environment variable pattern
-        api_key_pattern = r"hf_[A-Za-z0-9_]{30,}"
-        placeholder_patterns = [
-            # JavaScript patterns
-            (r"const HF_API_KEY = '[^']*';", "const HF_API_KEY = process.env.HF_API_KEY || 'YOUR_HUGGING_FACE_TOKEN';"),
-            (r'const HF_API_KEY = "[^"]*";', 'const HF_API_KEY = process.env.HF_API_KEY || "YOUR_HUGGING_FACE_TOKEN";'),
-            (r"HF_API_KEY = '[^']*'", "HF_API_KEY = 'YOUR_HUGGING_FACE_TOKEN'"),
-            (r'HF_API_KEY = "[^"]*"', 'HF_API_KEY = "YOUR_HUGGING_FACE_TOKEN"'),
-            
-            # Direct API key replacements
-            (api_key_pattern, "YOUR_HUGGING_FACE_TOKEN"),
-        ]
-        
-        changes_made = False
-        for pattern, replacement in placeholder_patterns:
-            if re.search(pattern, content):
-                content = re.sub(pattern, replacement, content)
-                changes_made = True
-                print(f"  🔧 Sanitized API key pattern in {file_path.name}")
+        content, count = _FUSED_PATTERN.subn(_replace_match, content)
+        changes_made = count > 0
+        if changes_made:
+            print(f"  🔧 Sanitized {count} API key pattern(s) in {file_path.name}")
         
         # Write back if changes were made
         if changes_made:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            file_path.write_bytes(content)
             print(f"✅ Sanitized: {file_path}")
             return True
         else:
@@ -55,21 +65,19 @@ def main():
     
     recovery_root = Path("d:/projects/recovered-files")
     
-    # File patterns to sanitize
-    file_patterns = [
-        "**/*.html",
-        "**/*.js",
-        "**/*.py"
-    ]
+    # File extensions to sanitize
+    file_extensions = (".html", ".js", ".py")
     
     sanitized_files = []
     
     print("🔒 Starting API Key Sanitization...")
     print("=" * 60)
     
-    for pattern in file_patterns:
-        for file_path in recovery_root.glob(pattern):
-            if file_path.is_file():
+    # Single walk of the tree; os.walk already separates files from dirs
+    for root, _, files in os.walk(recovery_root):
+        for name in files:
+            if name.endswith(file_extensions):
+                file_path = Path(root, name)
                 if sanitize_file(file_path):
                     sanitized_files.append(str(file_path))
     
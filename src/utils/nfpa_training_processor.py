@@ -5,246 +5,255 @@ Extracts and processes NFPA 1001 firefighter qualification standards
 for integration into Marine Fire Response Training System
 """
 
-import json
+import orjson
 import re
 from pathlib import Path
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+
+def _freeze(value):
+    """Read-only copy of nested dict/list literals: mapping proxies and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _dumps(data) -> bytes:
+    """Indented JSON for the frozen training data"""
+    return orjson.dumps(data, default=dict, option=orjson.OPT_INDENT_2)
 
 class NFPATrainingProcessor:
     """Process NFPA 1001 data for fire response training"""
     
-    def __init__(self, data_dir: str = "d:/projects/website-files/training-data"):
-        self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        
-        # NFPA 1001 Key Competency Areas (publicly available structure)
-        self.competency_areas = {
-            "general_requirements": {
-                "description": "General knowledge and skills for firefighters",
-                "topics": [
-                    "Fire behavior and combustion",
-                    "Building construction",
-                    "Fire department organization",
-                    "Safety procedures and protocols",
-                    "Communications and terminology"
-                ]
-            },
-            "fire_suppression": {
-                "description": "Fire suppression operations and techniques",
-                "topics": [
-                    "Hose line operations",
-                    "Water supply systems", 
-                    "Foam operations",
-                    "Ventilation techniques",
-                    "Search and rescue operations"
-                ]
-            },
-            "rescue_operations": {
-                "description": "Emergency rescue and extrication",
-                "topics": [
-                    "Vehicle extrication",
-                    "Confined space rescue",
-                    "Water rescue operations", 
-                    "Emergency medical care",
-                    "Technical rescue systems"
-                ]
-            },
-            "hazmat_operations": {
-                "description": "Hazardous materials response",
-                "topics": [
-                    "Chemical identification",
-                    "Containment procedures",
-                    "Decontamination processes",
-                    "Personal protective equipment",
-                    "Emergency response planning"
-                ]
-            },
-            "marine_firefighting": {
-                "description": "Shipboard and marine fire response systems",
-                "topics": [
-                    "Ship systems and layout",
-                    "Marine fire suppression systems",
-                    "Compartment firefighting",
-                    "Damage control procedures",
-                    "Aviation fuel fire response"
-                ]
-            }
+    # NFPA 1001 Key Competency Areas (publicly available structure)
+    COMPETENCY_AREAS = _freeze({
+        "general_requirements": {
+            "description": "General knowledge and skills for firefighters",
+            "topics": [
+                "Fire behavior and combustion",
+                "Building construction",
+                "Fire department organization",
+                "Safety procedures and protocols",
+                "Communications and terminology"
+            ]
+        },
+        "fire_suppression": {
+            "description": "Fire suppression operations and techniques",
+            "topics": [
+                "Hose line operations",
+                "Water supply systems", 
+                "Foam operations",
+                "Ventilation techniques",
+                "Search and rescue operations"
+            ]
+        },
+        "rescue_operations": {
+            "description": "Emergency rescue and extrication",
+            "topics": [
+                "Vehicle extrication",
+                "Confined space rescue",
+                "Water rescue operations", 
+                "Emergency medical care",
+                "Technical rescue systems"
+            ]
+        },
+        "hazmat_operations": {
+            "description": "Hazardous materials response",
+            "topics": [
+                "Chemical identification",
+                "Containment procedures",
+                "Decontamination processes",
+                "Personal protective equipment",
+                "Emergency response planning"
+            ]
+        },
+        "marine_firefighting": {
+            "description": "Shipboard and marine fire response systems",
+            "topics": [
+                "Ship systems and layout",
+                "Marine fire suppression systems",
+                "Compartment firefighting",
+                "Damage control procedures",
+                "Aviation fuel fire response"
+            ]
         }
-    
-    def create_training_scenarios(self) -> List[Dict[str, Any]]:
-        """Generate NFPA 1001 compliant training scenarios"""
-        
-        scenarios = []
-        
+    })
+
+    # Static training content, built once at class definition and shared
+    # by every instance; frozen so no caller can change it for the others
+    _SCENARIOS = _freeze([
         # Fire Suppression Scenarios
-        scenarios.extend([
-            {
-                "id": "nfpa_fs_001",
-                "title": "STRUCTURAL FIRE ATTACK - NFPA 1001 Compliant",
-                "category": "fire_suppression",
-                "nfpa_reference": "NFPA 1001 - Fire Suppression Operations",
-                "description": "Two-story residential structure fire with occupants trapped on second floor. Heavy smoke showing from first floor windows.",
-                "learning_objectives": [
-                    "Demonstrate proper hose line selection and deployment",
-                    "Execute coordinated ventilation operations", 
-                    "Perform primary search operations",
-                    "Apply NFPA water flow calculations"
-                ],
-                "scenario_details": {
-                    "location": "Two-story single family residence",
-                    "conditions": "Heavy smoke, limited visibility, potential flashover conditions",
-                    "resources": "Engine company, truck company, rescue squad",
-                    "weather": "Clear, 15 mph winds from southwest"
-                },
-                "assessment_criteria": [
-                    "Proper size-up and initial actions",
-                    "Appropriate hose line selection (1.75\" vs 2.5\")",
-                    "Coordinated ventilation timing",
-                    "Search pattern execution",
-                    "Water application technique"
-                ]
+        {
+            "id": "nfpa_fs_001",
+            "title": "STRUCTURAL FIRE ATTACK - NFPA 1001 Compliant",
+            "category": "fire_suppression",
+            "nfpa_reference": "NFPA 1001 - Fire Suppression Operations",
+            "description": "Two-story residential structure fire with occupants trapped on second floor. Heavy smoke showing from first floor windows.",
+            "learning_objectives": [
+                "Demonstrate proper hose line selection and deployment",
+                "Execute coordinated ventilation operations", 
+                "Perform primary search operations",
+                "Apply NFPA water flow calculations"
+            ],
+            "scenario_details": {
+                "location": "Two-story single family residence",
+                "conditions": "Heavy smoke, limited visibility, potential flashover conditions",
+                "resources": "Engine company, truck company, rescue squad",
+                "weather": "Clear, 15 mph winds from southwest"
+            },
+            "assessment_criteria": [
+                "Proper size-up and initial actions",
+                "Appropriate hose line selection (1.75\" vs 2.5\")",
+                "Coordinated ventilation timing",
+                "Search pattern execution",
+                "Water application technique"
+            ]
+        },
+        {
+            "id": "nfpa_hm_001", 
+            "title": "HAZMAT INCIDENT - CHEMICAL LEAK",
+            "category": "hazmat_operations",
+            "nfpa_reference": "NFPA 1001 - Hazardous Materials Operations",
+            "description": "Unknown chemical leak at industrial facility. Multiple workers reporting respiratory distress.",
+            "learning_objectives": [
+                "Demonstrate proper approach and isolation procedures",
+                "Identify hazardous materials using ERG",
+                "Select appropriate PPE levels",
+                "Execute decontamination procedures"
+            ],
+            "scenario_details": {
+                "location": "Chemical processing plant",
+                "conditions": "Unknown vapor cloud, multiple casualties",
+                "resources": "Hazmat team, EMS units, law enforcement",
+                "weather": "Light winds, potential for vapor spread"
             },
-            {
-                "id": "nfpa_hm_001", 
-                "title": "HAZMAT INCIDENT - CHEMICAL LEAK",
-                "category": "hazmat_operations",
-                "nfpa_reference": "NFPA 1001 - Hazardous Materials Operations",
-                "description": "Unknown chemical leak at industrial facility. Multiple workers reporting respiratory distress.",
-                "learning_objectives": [
-                    "Demonstrate proper approach and isolation procedures",
-                    "Identify hazardous materials using ERG",
-                    "Select appropriate PPE levels",
-                    "Execute decontamination procedures"
-                ],
-                "scenario_details": {
-                    "location": "Chemical processing plant",
-                    "conditions": "Unknown vapor cloud, multiple casualties",
-                    "resources": "Hazmat team, EMS units, law enforcement",
-                    "weather": "Light winds, potential for vapor spread"
-                },
-                "assessment_criteria": [
-                    "Initial isolation distance establishment",
-                    "Proper ERG usage and chemical identification",
-                    "PPE selection rationale",
-                    "Decontamination setup and execution"
-                ]
-            }
-        ])
+            "assessment_criteria": [
+                "Initial isolation distance establishment",
+                "Proper ERG usage and chemical identification",
+                "PPE selection rationale",
+                "Decontamination setup and execution"
+            ]
+        },
         
         # Marine Firefighting Scenarios
-        scenarios.extend([
-            {
-                "id": "nfpa_marine_001",
-                "title": "AIRCRAFT HANGAR FIRE - MARINE OPERATIONS",
-                "category": "marine_firefighting", 
-                "nfpa_reference": "NFPA 1001 + Marine Fire Fighting Standards",
-                "description": "Class B fire involving aviation fuel in aircraft hangar bay. Aircraft and personnel at risk.",
-                "learning_objectives": [
-                    "Apply marine firefighting principles per NFPA 1001",
-                    "Demonstrate AFFF system operation",
-                    "Execute shipboard evacuation procedures",
-                    "Coordinate with damage control teams"
-                ],
-                "scenario_details": {
-                    "location": "Marine Aircraft Hangar Bay",
-                    "conditions": "Aviation fuel fire, heavy smoke, confined space",
-                    "resources": "Ship's fire party, damage control teams, flight deck crew",
-                    "special_considerations": "Sea state, aircraft movement limitations"
-                },
-                "assessment_criteria": [
-                    "Proper foam application technique",
-                    "Coordination with ship systems",
-                    "Personnel accountability procedures", 
-                    "Damage assessment and reporting"
-                ]
-            }
-        ])
-        
-        return scenarios
-    
-    def create_knowledge_base(self) -> Dict[str, Any]:
-        """Create NFPA 1001 knowledge base for AI training"""
-        
-        knowledge_base = {
-            "standards_reference": "NFPA 1001 - Standard for Fire Fighter Professional Qualifications",
-            "version": "2019 Edition",
-            "scope": "Professional qualifications for firefighters",
-            "competency_areas": self.competency_areas,
-            "key_principles": {
-                "fire_behavior": [
-                    "Fire triangle: heat, fuel, oxygen",
-                    "Stages of fire development",
-                    "Flashover and backdraft conditions",
-                    "Thermal layering in compartments"
-                ],
-                "safety_principles": [
-                    "Risk assessment and management",
-                    "Personal protective equipment requirements",
-                    "Accountability systems",
-                    "Incident command structure"
-                ],
-                "tactical_operations": [
-                    "Size-up procedures",
-                    "Attack line selection and deployment",
-                    "Ventilation coordination",
-                    "Search and rescue priorities"
-                ]
+        {
+            "id": "nfpa_marine_001",
+            "title": "AIRCRAFT HANGAR FIRE - MARINE OPERATIONS",
+            "category": "marine_firefighting", 
+            "nfpa_reference": "NFPA 1001 + Marine Fire Fighting Standards",
+            "description": "Class B fire involving aviation fuel in aircraft hangar bay. Aircraft and personnel at risk.",
+            "learning_objectives": [
+                "Apply marine firefighting principles per NFPA 1001",
+                "Demonstrate AFFF system operation",
+                "Execute shipboard evacuation procedures",
+                "Coordinate with damage control teams"
+            ],
+            "scenario_details": {
+                "location": "Marine Aircraft Hangar Bay",
+                "conditions": "Aviation fuel fire, heavy smoke, confined space",
+                "resources": "Ship's fire party, damage control teams, flight deck crew",
+                "special_considerations": "Sea state, aircraft movement limitations"
             },
-            "assessment_methods": [
-                "Written examinations",
-                "Practical skill demonstrations",
-                "Scenario-based evaluations",
-                "Competency verification"
+            "assessment_criteria": [
+                "Proper foam application technique",
+                "Coordination with ship systems",
+                "Personnel accountability procedures", 
+                "Damage assessment and reporting"
             ]
         }
-        
-        return knowledge_base
+    ])
+
+    _KNOWLEDGE_BASE = _freeze({
+        "standards_reference": "NFPA 1001 - Standard for Fire Fighter Professional Qualifications",
+        "version": "2019 Edition",
+        "scope": "Professional qualifications for firefighters",
+        "competency_areas": COMPETENCY_AREAS,
+        "key_principles": {
+            "fire_behavior": [
+                "Fire triangle: heat, fuel, oxygen",
+                "Stages of fire development",
+                "Flashover and backdraft conditions",
+                "Thermal layering in compartments"
+            ],
+            "safety_principles": [
+                "Risk assessment and management",
+                "Personal protective equipment requirements",
+                "Accountability systems",
+                "Incident command structure"
+            ],
+            "tactical_operations": [
+                "Size-up procedures",
+                "Attack line selection and deployment",
+                "Ventilation coordination",
+                "Search and rescue priorities"
+            ]
+        },
+        "assessment_methods": [
+            "Written examinations",
+            "Practical skill demonstrations",
+            "Scenario-based evaluations",
+            "Competency verification"
+        ]
+    })
+
+    _PROMPTS = _freeze([
+        {
+            "category": "fire_behavior",
+            "prompt": "You are a fire training instructor teaching NFPA 1001 fire behavior principles. Explain the fire development process and key warning signs firefighters must recognize.",
+            "context": "NFPA 1001 emphasizes understanding fire behavior for firefighter safety and effective suppression operations."
+        },
+        {
+            "category": "tactics",
+            "prompt": "As a fire tactics instructor following NFPA 1001 standards, describe the proper size-up process and initial tactical priorities for a structure fire.",
+            "context": "NFPA 1001 requires firefighters to demonstrate systematic approach to fire ground operations."
+        },
+        {
+            "category": "safety",
+            "prompt": "You are teaching NFPA 1001 safety procedures. Explain the risk management process and when firefighters should transition from offensive to defensive operations.",
+            "context": "NFPA 1001 prioritizes firefighter safety through proper risk assessment and decision-making."
+        },
+        {
+            "category": "marine_ops",
+            "prompt": "As a marine fire instructor combining NFPA 1001 principles with shipboard operations, explain the unique considerations for firefighting aboard marine vessels.",
+            "context": "Marine firefighting applies NFPA 1001 fundamentals adapted for marine environment and ship systems."
+        }
+    ])
     
-    def generate_training_prompts(self) -> List[Dict[str, str]]:
+    def __init__(self, data_dir: str = "d:/projects/website-files/training-data"):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.competency_areas = self.COMPETENCY_AREAS
+    
+    def create_training_scenarios(self) -> Sequence[Mapping[str, Any]]:
+        """Generate NFPA 1001 compliant training scenarios"""
+        return self._SCENARIOS
+    
+    def create_knowledge_base(self) -> Mapping[str, Any]:
+        """Create NFPA 1001 knowledge base for AI training"""
+        return self._KNOWLEDGE_BASE
+    
+    def generate_training_prompts(self) -> Sequence[Mapping[str, str]]:
         """Generate AI training prompts based on NFPA 1001"""
-        
-        prompts = [
-            {
-                "category": "fire_behavior",
-                "prompt": "You are a fire training instructor teaching NFPA 1001 fire behavior principles. Explain the fire development process and key warning signs firefighters must recognize.",
-                "context": "NFPA 1001 emphasizes understanding fire behavior for firefighter safety and effective suppression operations."
-            },
-            {
-                "category": "tactics",
-                "prompt": "As a fire tactics instructor following NFPA 1001 standards, describe the proper size-up process and initial tactical priorities for a structure fire.",
-                "context": "NFPA 1001 requires firefighters to demonstrate systematic approach to fire ground operations."
-            },
-            {
-                "category": "safety",
-                "prompt": "You are teaching NFPA 1001 safety procedures. Explain the risk management process and when firefighters should transition from offensive to defensive operations.",
-                "context": "NFPA 1001 prioritizes firefighter safety through proper risk assessment and decision-making."
-            },
-            {
-                "category": "marine_ops",
-                "prompt": "As a marine fire instructor combining NFPA 1001 principles with shipboard operations, explain the unique considerations for firefighting aboard marine vessels.",
-                "context": "Marine firefighting applies NFPA 1001 fundamentals adapted for marine environment and ship systems."
-            }
-        ]
-        
-        return prompts
+        return self._PROMPTS
     
     def save_training_data(self):
         """Save all training data to files"""
         
         # Save scenarios
         scenarios = self.create_training_scenarios()
-        with open(self.data_dir / "nfpa_1001_scenarios.json", 'w') as f:
-            json.dump(scenarios, f, indent=2)
+        with open(self.data_dir / "nfpa_1001_scenarios.json", 'wb') as f:
+            f.write(_dumps(scenarios))
         
         # Save knowledge base
         knowledge_base = self.create_knowledge_base()
-        with open(self.data_dir / "nfpa_1001_knowledge_base.json", 'w') as f:
-            json.dump(knowledge_base, f, indent=2)
+        with open(self.data_dir / "nfpa_1001_knowledge_base.json", 'wb') as f:
+            f.write(_dumps(knowledge_base))
         
         # Save training prompts
         prompts = self.generate_training_prompts()
-        with open(self.data_dir / "nfpa_1001_prompts.json", 'w') as f:
-            json.dump(prompts, f, indent=2)
+        with open(self.data_dir / "nfpa_1001_prompts.json", 'wb') as f:
+            f.write(_dumps(prompts))
         
         print("✅ NFPA 1001 training data generated successfully!")
         print(f"📁 Files saved to: {self.data_dir}")
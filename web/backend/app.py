@@ -1,44 +1,96 @@
 """
 Flask server to serve the DCA assessment web interface
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, request, jsonify
 from flask_cors import CORS
+from collections import OrderedDict
+import hashlib
 import os
 import sys
+import threading
+import uuid
 
 # Add src directory to path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from dca_question_states import DCAAssessmentManager
 from dca_response_evaluator import SimpleResponseEvaluator
+from json_provider import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
 
-# Initialize our assessment system
-assessment_manager = DCAAssessmentManager()
+# The evaluator is read-only and shared; assessment progress is per client
 evaluator = SimpleResponseEvaluator()
 
+SESSION_COOKIE = 'dca_session'
+MAX_SESSIONS = 1000  # Least recently used sessions are evicted past this
+
+_sessions: 'OrderedDict[str, DCAAssessmentManager]' = OrderedDict()
+_sessions_lock = threading.Lock()
+
+def get_assessment_manager(session_id: str) -> DCAAssessmentManager:
+    """Return the assessment manager for a client, creating it if needed"""
+    with _sessions_lock:
+        manager = _sessions.get(session_id)
+        if manager is None:
+            manager = DCAAssessmentManager()
+            _sessions[session_id] = manager
+            if len(_sessions) > MAX_SESSIONS:
+                _sessions.popitem(last=False)
+        else:
+            _sessions.move_to_end(session_id)
+        return manager
+
+INDEX_FILE = 'comprehensive.html'
+
+# (bytes, etag) for the assessment page, read once on first request
+_index_cache = None
+
 @app.route('/')
 def index():
     """Serve the main assessment page"""
-    return send_from_directory('.', 'comprehensive.html')
+    global _index_cache
+    if _index_cache is None:
+        try:
+            with open(INDEX_FILE, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            abort(404)
+        _index_cache = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+
+    body, etag = _index_cache
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 @app.route('/api/evaluate', methods=['POST'])
 def evaluate_response():
     """Evaluate a DCA response"""
     data = request.json
     
+    session_id = request.cookies.get(SESSION_COOKIE)
+    new_session = session_id is None
+    if new_session:
+        session_id = uuid.uuid4().hex
+    assessment_manager = get_assessment_manager(session_id)
+    
     # Get the current question
     question = assessment_manager.get_current_question()
     if not question:
         return jsonify({'error': 'No active question'}), 404
     
     # Submit and evaluate the answer
-    response_data = assessment_manager.submit_answer(
-        data['selectedAnswer'],
-        data['responseTime']
-    )
+    try:
+        response_data = assessment_manager.submit_answer(
+            data['selectedAnswer'],
+            data['responseTime']
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Get DQN evaluation
     evaluation = evaluator.evaluate_response(
@@ -47,8 +99,17 @@ def evaluate_response():
         {'phase': question.scenario}
     )
     
-    return jsonify(evaluation)
+    response = jsonify(evaluation)
+    if new_session:
+        response.set_cookie(SESSION_COOKIE, session_id, httponly=True,
+                            samesite='Lax')
+    return response
 
 if __name__ == '__main__':
-    # Run in debug mode
-    app.run(debug=True, port=5000)
+    # Development server only; set FLASK_DEBUG=1 for the reloader/debugger.
+    # In production serve wsgi:app with waitress or gunicorn instead.
+    app.run(
+        debug=os.environ.get('FLASK_DEBUG') == '1',
+        port=int(os.environ.get('PORT', 5000)),
+        threaded=True
+    )
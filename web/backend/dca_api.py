@@ -4,26 +4,81 @@ DCA Assessment API Endpoints
 Handles evaluation of DCA responses and provides feedback
 """
 
-from flask import Blueprint, request, jsonify
-from dca_question_states import DCAQuestionStates
-from dca_response_evaluator import DCAResponseEvaluator
-import torch
+from flask import Blueprint, Response, request, jsonify
+from dca_question_states import DCAQuestionStates, DCAScenarioState
+import hashlib
+import orjson
+import threading
 
 # Create Blueprint for DCA endpoints
 dca_api = Blueprint('dca_api', __name__)
 
 # Initialize our evaluation systems
 question_states = DCAQuestionStates()
-response_evaluator = DCAResponseEvaluator()
 
-# Load trained model if available
-try:
-    model_path = 'models/dca_response_model.pth'
-    response_evaluator.load_state_dict(torch.load(model_path))
-    response_evaluator.eval()
-    print("✅ Loaded DCA response model")
-except Exception as e:
-    print(f"⚠️ Could not load DCA model: {e}")
+MODEL_PATH = 'models/dca_response_model.pth'
+
+# The DQN evaluator (and torch with it) is only loaded on the first
+# /api/dca/evaluate request, so workers that never serve it stay small
+_response_evaluator = None
+_response_evaluator_lock = threading.Lock()
+
+def get_response_evaluator():
+    """Return the shared DQN evaluator, importing torch on first use"""
+    global _response_evaluator
+    if _response_evaluator is None:
+        with _response_evaluator_lock:
+            if _response_evaluator is None:
+                import torch
+                from dca_response_evaluator import DCAResponseEvaluator
+
+                # Waitress already serves requests from a thread pool; keep
+                # each forward pass single-threaded to avoid oversubscription
+                torch.set_num_threads(1)
+
+                evaluator = DCAResponseEvaluator()
+                # Load trained model if available
+                try:
+                    evaluator.load_state_dict(
+                        torch.load(MODEL_PATH, map_location='cpu', mmap=True)
+                    )
+                    evaluator.prepare_for_serving()
+                    print("✅ Loaded DCA response model")
+                except Exception as e:
+                    print(f"⚠️ Could not load DCA model: {e}")
+                _response_evaluator = evaluator
+    return _response_evaluator
+
+# Per-thread response skeleton for /api/dca/evaluate. Each request
+# overwrites the leaves and serializes it before the thread is reused.
+_local = threading.local()
+
+def _evaluate_response_template():
+    return {
+        'new_state': None,
+        'consequence': {
+            'time_penalty': None,
+            'explanation': None,
+            'risk_level': None
+        },
+        'is_optimal': None,
+        'optimal_choice': None,
+        'dqn_evaluation': {
+            'confidence': None,
+            'value': None
+        }
+    }
+
+# Fields every /api/dca/evaluate request body must carry
+_REQUIRED_FIELDS = frozenset(('question_id', 'choice', 'current_state'))
+
+# Question details are static: serialize them once and serve the bytes
+_QUESTION_CACHE = {}
+for _qid, _question in question_states.question_states.items():
+    _payload = orjson.dumps(_question)
+    _QUESTION_CACHE[_qid] = (
+        _payload, hashlib.blake2b(_payload, digest_size=8).hexdigest()
+    )
 
 @dca_api.route('/api/dca/evaluate', methods=['POST'])
 def evaluate_dca_response():
@@ -31,44 +86,47 @@ def evaluate_dca_response():
     Evaluate a DCA response choice and return consequences
     """
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data(cache=False))
         
-        if not all(k in data for k in ['question_id', 'choice', 'current_state']):
+        if not isinstance(data, dict) or not _REQUIRED_FIELDS <= data.keys():
             return jsonify({
                 'error': 'Missing required fields'
             }), 400
 
+        # Convert at the HTTP edge; everything below works on the dataclass
+        current_state = DCAScenarioState.from_dict(data['current_state'])
+
         # Get base evaluation from question states
         base_eval = question_states.evaluate_choice(
             data['question_id'],
             data['choice'],
-            data['current_state']
+            current_state
         )
         
         # Get DQN evaluation
-        dqn_eval = response_evaluator.evaluate_response(
+        dqn_eval = get_response_evaluator().evaluate_response(
             data['question_id'],
             data['choice'],
-            data['current_state']
+            current_state
         )
         
-        # Combine evaluations
-        response = {
-            'new_state': base_eval['new_state'],
-            'consequence': {
-                'time_penalty': base_eval['consequence']['time_penalty'],
-                'explanation': base_eval['consequence']['explanation'],
-                'risk_level': dqn_eval['confidence']
-            },
-            'is_optimal': base_eval['is_optimal'],
-            'optimal_choice': base_eval['optimal'],
-            'dqn_evaluation': {
-                'confidence': dqn_eval['confidence'],
-                'value': dqn_eval['dqn_value']
-            }
-        }
+        # Combine evaluations into this thread's response skeleton;
+        # orjson serializes the DCAScenarioState dataclass directly
+        response = getattr(_local, 'response', None)
+        if response is None:
+            response = _local.response = _evaluate_response_template()
+        consequence = response['consequence']
+        consequence['time_penalty'] = base_eval['consequence']['time_penalty']
+        consequence['explanation'] = base_eval['consequence']['explanation']
+        consequence['risk_level'] = dqn_eval['confidence']
+        response['new_state'] = base_eval['new_state']
+        response['is_optimal'] = base_eval['is_optimal']
+        response['optimal_choice'] = base_eval['optimal']
+        dqn_evaluation = response['dqn_evaluation']
+        dqn_evaluation['confidence'] = dqn_eval['confidence']
+        dqn_evaluation['value'] = dqn_eval['dqn_value']
         
-        return jsonify(response)
+        return Response(orjson.dumps(response), mimetype='application/json')
 
     except ValueError as ve:
         return jsonify({
@@ -86,8 +144,16 @@ def get_question(question_id):
     Get details for a specific question
     """
     try:
-        question = question_states.get_question_details(question_id)
-        return jsonify(question)
+        cached = _QUESTION_CACHE.get(question_id)
+        if cached is None:
+            raise ValueError(f"Unknown question ID: {question_id}")
+
+        payload, etag = cached
+        response = Response(payload, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+        return response.make_conditional(request)
     except ValueError as ve:
         return jsonify({
             'error': str(ve)
@@ -4,41 +4,366 @@ DCA Feedback Web API Integration
 Web endpoints for collecting and managing DCA assessment feedback
 """
 
+import atexit
 import json
+import logging
+import logging.handlers
+import os
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from datetime import datetime, timezone
 from pathlib import Path
-from flask import Flask, request, jsonify
+import orjson
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+
+from json_provider import OrjsonProvider
+
+logger = logging.getLogger(__name__)
 
 # Import our feedback system
 try:
     from dca_feedback_system import DCAFeedbackCollector, DCAFeedbackAnalyzer, DCAModelRetrainer
 except ImportError:
-    print("⚠️  DCA Feedback system not available")
+    logger.warning("⚠️  DCA Feedback system not available")
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """Report any unhandled route error as a JSON 500"""
+    if isinstance(e, HTTPException):
+        return e
+    logger.exception("❌ Feedback API request failed")
+    return jsonify({'error': str(e)}), 500
+
 # Global feedback system instances
 feedback_collector = None
 feedback_analyzer = None
 model_retrainer = None
 
+# Shared SQLite connections, opened once instead of per request
+POOL_SIZE = 8
+_pool = queue.Queue(maxsize=POOL_SIZE)
+
+def _open_connection(db_path):
+    """Open an autocommit connection tuned for concurrent web access"""
+    # Every statement the API runs is a module-level constant, so a larger
+    # per-connection statement cache keeps all of them compiled
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                           cached_statements=128)
+    # Rows share one column description; dict(row) is done in C
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+    """)
+    return conn
+
+# Running totals for /metrics, kept current by triggers so the endpoint
+# reads one row instead of counting every table. Seeded from the existing
+# rows the first time the summary is created.
+_SUMMARY_SQL = """
+    BEGIN IMMEDIATE;
+    
+    CREATE TABLE IF NOT EXISTS feedback_summary (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_sessions INTEGER NOT NULL,
+        total_actions INTEGER NOT NULL,
+        total_feedback INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS rating_counts (
+        rating,
+        n INTEGER NOT NULL
+    );
+    
+    INSERT INTO rating_counts (rating, n)
+        SELECT feedback_rating, COUNT(*) FROM user_feedback
+        WHERE NOT EXISTS (SELECT 1 FROM feedback_summary)
+        GROUP BY feedback_rating;
+    INSERT OR IGNORE INTO feedback_summary VALUES (
+        1,
+        (SELECT COUNT(*) FROM assessment_sessions),
+        (SELECT COUNT(*) FROM assessment_actions),
+        (SELECT COUNT(*) FROM user_feedback)
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS trg_sessions_ins AFTER INSERT ON assessment_sessions BEGIN
+        UPDATE feedback_summary SET total_sessions = total_sessions + 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_sessions_del AFTER DELETE ON assessment_sessions BEGIN
+        UPDATE feedback_summary SET total_sessions = total_sessions - 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_actions_ins AFTER INSERT ON assessment_actions BEGIN
+        UPDATE feedback_summary SET total_actions = total_actions + 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_actions_del AFTER DELETE ON assessment_actions BEGIN
+        UPDATE feedback_summary SET total_actions = total_actions - 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_feedback_ins AFTER INSERT ON user_feedback BEGIN
+        UPDATE feedback_summary SET total_feedback = total_feedback + 1 WHERE id = 1;
+        INSERT INTO rating_counts (rating, n) SELECT NEW.feedback_rating, 0
+            WHERE NOT EXISTS (SELECT 1 FROM rating_counts WHERE rating IS NEW.feedback_rating);
+        UPDATE rating_counts SET n = n + 1 WHERE rating IS NEW.feedback_rating;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_feedback_del AFTER DELETE ON user_feedback BEGIN
+        UPDATE feedback_summary SET total_feedback = total_feedback - 1 WHERE id = 1;
+        UPDATE rating_counts SET n = n - 1 WHERE rating IS OLD.feedback_rating;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_feedback_rating_upd
+    AFTER UPDATE OF feedback_rating ON user_feedback BEGIN
+        UPDATE rating_counts SET n = n - 1 WHERE rating IS OLD.feedback_rating;
+        INSERT INTO rating_counts (rating, n) SELECT NEW.feedback_rating, 0
+            WHERE NOT EXISTS (SELECT 1 FROM rating_counts WHERE rating IS NEW.feedback_rating);
+        UPDATE rating_counts SET n = n + 1 WHERE rating IS NEW.feedback_rating;
+    END;
+    
+    COMMIT;
+"""
+
+def init_connection_pool(db_path):
+    """Fill the connection pool for the feedback database"""
+    while not _pool.empty():
+        _pool.get_nowait().close()
+    for _ in range(POOL_SIZE):
+        _pool.put(_open_connection(db_path))
+    with get_conn() as conn:
+        conn.executescript(_SUMMARY_SQL)
+
+@contextmanager
+def get_conn():
+    """Borrow a pooled connection for the duration of a request"""
+    conn = _pool.get()
+    try:
+        yield conn
+    finally:
+        _pool.put(conn)
+
+def _action_data(data, timestamp):
+    """Collector fields for a logged action, with the API's defaults filled in"""
+    return {
+        'session_id': data.get('session_id'),
+        'step_number': data.get('step_number'),
+        'scenario_state': data.get('scenario_state'),
+        'ai_recommendation': data.get('ai_recommendation'),
+        'ai_confidence': data.get('ai_confidence', 0.5),
+        'user_action': data.get('user_action'),
+        'action_timestamp': timestamp,
+        'time_taken_seconds': data.get('time_taken_seconds', 0),
+        'immediate_reward': data.get('immediate_reward', 0)
+    }
+
+def _write_many(sql, rows):
+    """Write rows with one statement in a single transaction"""
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+# Session completions are queued and written by a single background thread
+# in transactions of up to COMPLETION_BATCH rows, off the request path
+COMPLETION_BATCH = 50
+_completion_queue = queue.Queue()
+_completion_writer = None
+# Readers and shutdown never wait longer than this for the writer
+COMPLETION_WAIT_TIMEOUT = 5.0
+
+_UPSERT_COMPLETION_SQL = """
+    INSERT INTO assessment_sessions
+    (session_id, end_time, completion_status, final_score)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        end_time = excluded.end_time,
+        completion_status = excluded.completion_status,
+        final_score = excluded.final_score
+"""
+
+def _write_completions(batch):
+    """Upsert completions as one batch, falling back to one row at a time"""
+    try:
+        _write_many(_UPSERT_COMPLETION_SQL, batch)
+        return
+    except Exception as e:
+        logger.warning("⚠️ Batch completion write failed, retrying per row: %s", e)
+    for row in batch:
+        try:
+            _write_many(_UPSERT_COMPLETION_SQL, [row])
+        except Exception as e:
+            logger.error("❌ Failed to write completion for session %s: %s", row[0], e)
+
+def _completion_writer_loop():
+    """Drain queued session completions in batches"""
+    while True:
+        batch = [_completion_queue.get()]
+        while len(batch) < COMPLETION_BATCH:
+            try:
+                batch.append(_completion_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            # A session's actions should land before its completion, but a
+            # failed action flush must not cost the completions their write
+            if feedback_collector:
+                try:
+                    feedback_collector.flush()
+                except Exception as e:
+                    logger.error("❌ Failed to flush buffered actions: %s", e)
+            _write_completions(batch)
+        finally:
+            for _ in batch:
+                _completion_queue.task_done()
+
+def _start_completion_writer():
+    """Start the background completion writer once"""
+    global _completion_writer
+    if _completion_writer is None or not _completion_writer.is_alive():
+        _completion_writer = threading.Thread(
+            target=_completion_writer_loop, name='completion-writer', daemon=True
+        )
+        _completion_writer.start()
+
+def wait_for_completions(timeout=COMPLETION_WAIT_TIMEOUT):
+    """Wait for queued completions to be written; False if they were not"""
+    if _completion_writer is None or not _completion_writer.is_alive():
+        return _completion_queue.unfinished_tasks == 0
+    deadline = time.monotonic() + timeout
+    with _completion_queue.all_tasks_done:
+        while _completion_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not _completion_writer.is_alive():
+                logger.warning(
+                    "⚠️ %d session completions still pending",
+                    _completion_queue.unfinished_tasks
+                )
+                return False
+            _completion_queue.all_tasks_done.wait(min(remaining, 0.5))
+    return True
+
+def flush_pending_writes():
+    """Make buffered actions, feedback and queued completions visible to readers"""
+    if feedback_collector:
+        feedback_collector.flush()
+    wait_for_completions()
+
+atexit.register(wait_for_completions)
+
+# Slow-changing GET endpoints keep their serialized body for CACHE_TTL seconds
+CACHE_TTL = 30.0
+CACHE_MAXSIZE = 32
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def cached_response(view):
+    """Serve repeated GETs from the serialized body of a recent 200 response"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (view.__name__, tuple(sorted(request.args.items())))
+        now = time.monotonic()
+        with _cache_lock:
+            hit = _response_cache.get(key)
+            if hit is not None and hit[0] > now:
+                return Response(hit[1], mimetype='application/json')
+        
+        rv = view(*args, **kwargs)
+        if isinstance(rv, Response) and rv.status_code == 200:
+            with _cache_lock:
+                _response_cache[key] = (now + CACHE_TTL, rv.get_data())
+                _response_cache.move_to_end(key)
+                while len(_response_cache) > CACHE_MAXSIZE:
+                    _response_cache.popitem(last=False)
+        return rv
+    return wrapper
+
+_log_listener = None
+
+def configure_logging(level=logging.INFO):
+    """Hand log records to a background thread so handler I/O stays off request threads"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    if not handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        handlers = [handler]
+    for handler in handlers:
+        root.removeHandler(handler)
+    
+    log_queue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 def initialize_feedback_system():
     """Initialize the DCA feedback system"""
     global feedback_collector, feedback_analyzer, model_retrainer
     
     try:
-        feedback_collector = DCAFeedbackCollector()
-        feedback_analyzer = DCAFeedbackAnalyzer()
-        model_retrainer = DCAModelRetrainer()
-        print("✅ DCA Feedback system initialized")
+        collector = DCAFeedbackCollector()
+        analyzer = DCAFeedbackAnalyzer()
+        retrainer = DCAModelRetrainer()
+        init_connection_pool(collector.db_path)
+        _start_completion_writer()
+        # Publish only once everything the endpoints rely on is running
+        feedback_collector = collector
+        feedback_analyzer = analyzer
+        model_retrainer = retrainer
+        logger.info("✅ DCA Feedback system initialized")
         return True
     except Exception as e:
-        print(f"❌ Failed to initialize feedback system: {e}")
+        logger.error("❌ Failed to initialize feedback system: %s", e)
         return False
 
+def _json_body(default=None):
+    """Parse the request body with orjson; None if it is not a JSON object"""
+    raw = request.get_data(cache=False)
+    if not raw:
+        return default
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+_INVALID_BODY = {'error': 'Request body must be a JSON object'}
+
+MAX_DAYS = 365
+
+@dataclass(slots=True, frozen=True)
+class FeedbackQuery:
+    """Query-string options shared by the analysis and export endpoints"""
+    days: int = 30
+    include_pii: bool = False
+    
+    @classmethod
+    def from_args(cls, args) -> 'FeedbackQuery':
+        """Parse request.args once, clamping days to 0..MAX_DAYS"""
+        days = args.get('days', 30, type=int)
+        return cls(
+            days=min(max(days, 0), MAX_DAYS),
+            include_pii=args.get('include_pii', 'false').lower() == 'true'
+        )
+
 @app.route('/api/dca/feedback/start_session', methods=['POST'])
 def start_feedback_session():
     """Start a new DCA assessment session for feedback collection"""
@@ -46,29 +371,30 @@ def start_feedback_session():
     if not feedback_collector:
         return jsonify({'error': 'Feedback system not initialized'}), 500
     
+    data = _json_body(default={})
+    if data is None:
+        return jsonify(_INVALID_BODY), 400
+    
+    session_data = {
+        'user_id': data.get('user_id', 'anonymous'),
+        'scenario_id': data.get('scenario_id'),
+        'scenario_source': data.get('scenario_source'),
+        'scenario_category': data.get('scenario_category'),
+        'start_time': datetime.now(timezone.utc).isoformat(),
+        'difficulty_level': data.get('difficulty_level', 'medium')
+    }
+    
     try:
-        data = request.get_json() or {}
-        
-        session_data = {
-            'user_id': data.get('user_id', 'anonymous'),
-            'scenario_id': data.get('scenario_id'),
-            'scenario_source': data.get('scenario_source'),
-            'scenario_category': data.get('scenario_category'),
-            'start_time': datetime.now().isoformat(),
-            'difficulty_level': data.get('difficulty_level', 'medium')
-        }
-        
         session_id = feedback_collector.log_assessment_session(session_data)
-        
-        return jsonify({
-            'success': True,
-            'session_id': session_id,
-            'message': 'Feedback session started',
-            'feedback_enabled': True
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'message': 'Feedback session started',
+        'feedback_enabled': True
+    })
 
 @app.route('/api/dca/feedback/log_action', methods=['POST'])
 def log_assessment_action():
@@ -77,31 +403,51 @@ def log_assessment_action():
     if not feedback_collector:
         return jsonify({'error': 'Feedback system not initialized'}), 400
     
+    data = _json_body()
+    if data is None:
+        return jsonify(_INVALID_BODY), 400
+    
+    # Buffered by the collector, which writes it within a couple of seconds
     try:
-        data = request.get_json()
-        
-        action_data = {
-            'session_id': data.get('session_id'),
-            'step_number': data.get('step_number'),
-            'scenario_state': data.get('scenario_state'),
-            'ai_recommendation': data.get('ai_recommendation'),
-            'ai_confidence': data.get('ai_confidence', 0.5),
-            'user_action': data.get('user_action'),
-            'action_timestamp': datetime.now().isoformat(),
-            'time_taken_seconds': data.get('time_taken_seconds', 0),
-            'immediate_reward': data.get('immediate_reward', 0)
-        }
-        
-        action_id = feedback_collector.log_assessment_action(action_data)
-        
-        return jsonify({
-            'success': True,
-            'action_id': action_id,
-            'message': 'Action logged for feedback analysis'
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        action_id = feedback_collector.log_assessment_action(
+            _action_data(data, datetime.now(timezone.utc).isoformat())
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'action_id': action_id,
+        'message': 'Action logged for feedback analysis'
+    })
+
+@app.route('/api/dca/feedback/log_actions_bulk', methods=['POST'])
+def log_assessment_actions_bulk():
+    """Log a batch of actions from one DCA assessment in a single transaction"""
+    
+    if not feedback_collector:
+        return jsonify({'error': 'Feedback system not initialized'}), 400
+    
+    data = _json_body()
+    if data is None:
+        return jsonify(_INVALID_BODY), 400
+    actions = data.get('actions')
+    if not isinstance(actions, list) or not all(isinstance(a, dict) for a in actions):
+        return jsonify({'error': "'actions' must be a list of objects"}), 400
+    
+    timestamp = datetime.now(timezone.utc).isoformat()
+    try:
+        action_ids = feedback_collector.log_assessment_actions(
+            [_action_data(action, timestamp) for action in actions]
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'action_ids': action_ids,
+        'message': f'{len(action_ids)} actions logged for feedback analysis'
+    })
 
 @app.route('/api/dca/feedback/submit_feedback', methods=['POST'])
 def submit_user_feedback():
@@ -110,30 +456,31 @@ def submit_user_feedback():
     if not feedback_collector:
         return jsonify({'error': 'Feedback system not initialized'}), 400
     
+    data = _json_body()
+    if data is None:
+        return jsonify(_INVALID_BODY), 400
+    
+    feedback_data = {
+        'session_id': data.get('session_id'),
+        'action_id': data.get('action_id'),
+        'feedback_type': data.get('feedback_type', 'recommendation'),
+        'feedback_rating': data.get('feedback_rating'),  # 1-5 scale
+        'feedback_text': data.get('feedback_text', ''),
+        'feedback_category': data.get('feedback_category', 'general'),
+        'expert_validation': data.get('expert_validation')  # 'approved', 'rejected', None
+    }
+    
     try:
-        data = request.get_json()
-        
-        feedback_data = {
-            'session_id': data.get('session_id'),
-            'action_id': data.get('action_id'),
-            'feedback_type': data.get('feedback_type', 'recommendation'),
-            'feedback_rating': data.get('feedback_rating'),  # 1-5 scale
-            'feedback_text': data.get('feedback_text', ''),
-            'feedback_category': data.get('feedback_category', 'general'),
-            'expert_validation': data.get('expert_validation')  # 'approved', 'rejected', None
-        }
-        
         feedback_id = feedback_collector.collect_user_feedback(feedback_data)
-        
-        return jsonify({
-            'success': True,
-            'feedback_id': feedback_id,
-            'message': 'Thank you for your feedback!',
-            'will_improve_model': True
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'feedback_id': feedback_id,
+        'message': 'Thank you for your feedback!',
+        'will_improve_model': True
+    })
 
 @app.route('/api/dca/feedback/complete_session', methods=['POST'])
 def complete_feedback_session():
@@ -142,138 +489,201 @@ def complete_feedback_session():
     if not feedback_collector:
         return jsonify({'error': 'Feedback system not initialized'}), 400
     
+    data = _json_body()
+    if data is None:
+        return jsonify(_INVALID_BODY), 400
+    session_id = data.get('session_id')
+    if not session_id:
+        return jsonify({'error': 'session_id is required'}), 400
     try:
-        data = request.get_json()
-        session_id = data.get('session_id')
-        
-        # Update session with completion data
-        with sqlite3.connect(feedback_collector.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE assessment_sessions 
-                SET end_time = ?, completion_status = ?, final_score = ?
-                WHERE session_id = ?
-            """, (
-                datetime.now().isoformat(),
-                data.get('completion_status', 'completed'),
-                data.get('final_score', 0),
-                session_id
-            ))
-            conn.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Session completed and logged for analysis',
-            'session_id': session_id
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        final_score = float(data.get('final_score', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'final_score must be a number'}), 400
+    completion_status = data.get('completion_status', 'completed')
+    if not isinstance(completion_status, str):
+        return jsonify({'error': 'completion_status must be a string'}), 400
+    # The upsert creates the session row if start_session was never
+    # logged for it; the writer thread commits it shortly after
+    _completion_queue.put((
+        session_id,
+        datetime.now(timezone.utc).isoformat(),
+        completion_status,
+        final_score
+    ))
+    
+    return jsonify({
+        'success': True,
+        'message': 'Session completed and logged for analysis',
+        'session_id': session_id
+    })
 
 @app.route('/api/dca/feedback/analysis', methods=['GET'])
+@cached_response
 def get_feedback_analysis():
     """Get analysis of recent feedback data"""
     
     if not feedback_analyzer:
         return jsonify({'error': 'Feedback analyzer not available'}), 500
     
-    try:
-        days_back = request.args.get('days', 30, type=int)
-        
-        analysis = feedback_analyzer.analyze_ai_recommendation_accuracy(days_back)
-        improvement_areas = feedback_analyzer.identify_improvement_areas()
-        
-        return jsonify({
-            'success': True,
-            'analysis_period_days': days_back,
-            'recommendation_accuracy': analysis,
-            'improvement_areas': improvement_areas,
-            'generated_at': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    days_back = FeedbackQuery.from_args(request.args).days
+    
+    flush_pending_writes()
+    analysis = feedback_analyzer.analyze_ai_recommendation_accuracy(days_back)
+    improvement_areas = feedback_analyzer.identify_improvement_areas()
+    
+    return jsonify({
+        'success': True,
+        'analysis_period_days': days_back,
+        'recommendation_accuracy': analysis,
+        'improvement_areas': improvement_areas,
+        'generated_at': datetime.now(timezone.utc)
+    })
 
 @app.route('/api/dca/feedback/training_recommendations', methods=['GET'])
+@cached_response
 def get_training_recommendations():
     """Get recommendations for model retraining"""
     
     if not model_retrainer:
         return jsonify({'error': 'Model retrainer not available'}), 500
     
-    try:
-        should_retrain, retrain_info = model_retrainer.should_retrain_model()
-        recommendations = feedback_analyzer.generate_training_recommendations()
-        config = model_retrainer.generate_retraining_config()
-        
-        return jsonify({
-            'success': True,
-            'should_retrain': should_retrain,
-            'retrain_info': retrain_info,
-            'training_recommendations': recommendations,
-            'retraining_config': config,
-            'generated_at': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    flush_pending_writes()
+    should_retrain, retrain_info = model_retrainer.should_retrain_model()
+    recommendations = feedback_analyzer.generate_training_recommendations()
+    config = model_retrainer.generate_retraining_config()
+    
+    return jsonify({
+        'success': True,
+        'should_retrain': should_retrain,
+        'retrain_info': retrain_info,
+        'training_recommendations': recommendations,
+        'retraining_config': config,
+        'generated_at': datetime.now(timezone.utc)
+    })
 
 @app.route('/api/dca/feedback/metrics', methods=['GET'])
+@cached_response
 def get_feedback_metrics():
     """Get current feedback system metrics"""
     
     if not feedback_collector:
         return jsonify({'error': 'Feedback system not initialized'}), 500
     
-    try:
-        db_path = feedback_collector.db_path
-        
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get basic counts
-            cursor.execute("SELECT COUNT(*) FROM assessment_sessions")
-            total_sessions = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM assessment_actions")
-            total_actions = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM user_feedback")
-            total_feedback = cursor.fetchone()[0]
-            
-            # Get recent activity (last 7 days)
-            cursor.execute("""
-                SELECT COUNT(*) FROM assessment_sessions 
-                WHERE created_at >= date('now', '-7 days')
-            """)
-            recent_sessions = cursor.fetchone()[0]
-            
-            # Get feedback rating distribution
-            cursor.execute("""
-                SELECT feedback_rating, COUNT(*) 
-                FROM user_feedback 
-                GROUP BY feedback_rating
-            """)
-            rating_distribution = dict(cursor.fetchall())
+    flush_pending_writes()
+    with get_conn() as conn:
+        cursor = conn.cursor()
         
-        metrics = {
-            'total_sessions': total_sessions,
-            'total_actions': total_actions,
-            'total_feedback_items': total_feedback,
-            'recent_sessions_7d': recent_sessions,
-            'feedback_rating_distribution': rating_distribution,
-            'feedback_collection_rate': (total_feedback / total_actions * 100) if total_actions > 0 else 0,
-            'system_status': 'operational'
-        }
+        # Totals come from the trigger-maintained summary row
+        cursor.execute("""
+            SELECT total_sessions, total_actions, total_feedback,
+                   (SELECT COUNT(*) FROM assessment_sessions
+                    WHERE created_at >= date('now', '-7 days'))
+            FROM feedback_summary WHERE id = 1
+        """)
+        total_sessions, total_actions, total_feedback, recent_sessions = cursor.fetchone()
         
-        return jsonify({
-            'success': True,
-            'metrics': metrics,
-            'generated_at': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        # Get feedback rating distribution
+        cursor.execute("""
+            SELECT rating, n FROM rating_counts
+            WHERE n > 0
+            ORDER BY rating
+        """)
+        rating_distribution = dict(cursor.fetchall())
+    
+    metrics = {
+        'total_sessions': total_sessions,
+        'total_actions': total_actions,
+        'total_feedback_items': total_feedback,
+        'recent_sessions_7d': recent_sessions,
+        'feedback_rating_distribution': rating_distribution,
+        'feedback_collection_rate': (total_feedback / total_actions * 100) if total_actions > 0 else 0,
+        'system_status': 'operational'
+    }
+    
+    return jsonify({
+        'success': True,
+        'metrics': metrics,
+        'generated_at': datetime.now(timezone.utc)
+    })
+
+_EXPORT_SESSIONS_PII_SQL = """
+    SELECT * FROM assessment_sessions
+    WHERE created_at >= date('now', ?)
+"""
+
+_EXPORT_SESSIONS_SQL = """
+    SELECT session_id, scenario_id, scenario_source, scenario_category,
+           start_time, end_time, completion_status, final_score, difficulty_level
+    FROM assessment_sessions
+    WHERE created_at >= date('now', ?)
+"""
+
+_EXPORT_ACTIONS_SQL = """
+    SELECT aa.action_id, aa.session_id, aa.step_number, aa.scenario_state,
+           aa.ai_recommendation, aa.ai_confidence, aa.user_action,
+           aa.action_timestamp, aa.time_taken_seconds, aa.immediate_reward
+    FROM assessment_actions aa
+    JOIN assessment_sessions asess ON aa.session_id = asess.session_id
+    WHERE asess.created_at >= date('now', ?)
+"""
+
+_EXPORT_FEEDBACK_SQL = """
+    SELECT uf.* FROM user_feedback uf
+    JOIN assessment_sessions asess ON uf.session_id = asess.session_id
+    WHERE asess.created_at >= date('now', ?)
+"""
+
+EXPORT_BATCH_SIZE = 500
+
+def _stream_rows(cursor, query, params):
+    """Yield one JSON array of query rows in comma-joined batches; returns the row count"""
+    cursor.execute(query, params)
+    count = 0
+    yield b'['
+    while True:
+        rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+        if not rows:
+            break
+        chunk = b','.join([orjson.dumps(dict(row), option=OrjsonProvider.option) for row in rows])
+        yield chunk if count == 0 else b',' + chunk
+        count += len(rows)
+    yield b']'
+    return count
+
+def _gzip_stream(chunks, level=6):
+    """Gzip a byte stream incrementally so compression doesn't buffer the export"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+def _generate_export(session_query, params, days_back, include_pii):
+    """Stream the export document; export_info follows the data so it can carry the totals"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        # One read transaction (and one shared lock) for all three queries
+        cursor.execute("BEGIN")
+        try:
+            yield b'{"success":true,"data":{"sessions":'
+            total_sessions = yield from _stream_rows(cursor, session_query, params)
+            yield b',"actions":'
+            total_actions = yield from _stream_rows(cursor, _EXPORT_ACTIONS_SQL, params)
+            yield b',"feedback":'
+            total_feedback = yield from _stream_rows(cursor, _EXPORT_FEEDBACK_SQL, params)
+        finally:
+            cursor.execute("COMMIT")
+    
+    export_info = {
+        'generated_at': datetime.now(timezone.utc),
+        'days_included': days_back,
+        'includes_pii': include_pii,
+        'total_sessions': total_sessions,
+        'total_actions': total_actions,
+        'total_feedback': total_feedback
+    }
+    yield b',"export_info":' + orjson.dumps(export_info) + b'}}'
 
 @app.route('/api/dca/feedback/export_data', methods=['GET'])
 def export_feedback_data():
@@ -282,73 +692,30 @@ def export_feedback_data():
     if not feedback_collector:
         return jsonify({'error': 'Feedback system not initialized'}), 500
     
-    try:
-        days_back = request.args.get('days', 30, type=int)
-        include_pii = request.args.get('include_pii', 'false').lower() == 'true'
-        
-        db_path = feedback_collector.db_path
-        
-        with sqlite3.connect(db_path) as conn:
-            # Export sessions
-            if include_pii:
-                session_query = """
-                    SELECT * FROM assessment_sessions 
-                    WHERE created_at >= date('now', '-{} days')
-                """.format(days_back)
-            else:
-                session_query = """
-                    SELECT session_id, scenario_id, scenario_source, scenario_category,
-                           start_time, end_time, completion_status, final_score, difficulty_level
-                    FROM assessment_sessions 
-                    WHERE created_at >= date('now', '-{} days')
-                """.format(days_back)
-            
-            cursor = conn.cursor()
-            cursor.execute(session_query)
-            sessions = [dict(zip([col[0] for col in cursor.description], row)) 
-                       for row in cursor.fetchall()]
-            
-            # Export actions
-            cursor.execute("""
-                SELECT aa.* FROM assessment_actions aa
-                JOIN assessment_sessions asess ON aa.session_id = asess.session_id
-                WHERE asess.created_at >= date('now', '-{} days')
-            """.format(days_back))
-            actions = [dict(zip([col[0] for col in cursor.description], row)) 
-                      for row in cursor.fetchall()]
-            
-            # Export feedback
-            cursor.execute("""
-                SELECT uf.* FROM user_feedback uf
-                JOIN assessment_sessions asess ON uf.session_id = asess.session_id
-                WHERE asess.created_at >= date('now', '-{} days')
-            """.format(days_back))
-            feedback = [dict(zip([col[0] for col in cursor.description], row)) 
-                       for row in cursor.fetchall()]
-        
-        export_data = {
-            'export_info': {
-                'generated_at': datetime.now().isoformat(),
-                'days_included': days_back,
-                'includes_pii': include_pii,
-                'total_sessions': len(sessions),
-                'total_actions': len(actions),
-                'total_feedback': len(feedback)
-            },
-            'sessions': sessions,
-            'actions': actions,
-            'feedback': feedback
-        }
-        
-        return jsonify({
-            'success': True,
-            'data': export_data
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    query = FeedbackQuery.from_args(request.args)
+    days_back, include_pii = query.days, query.include_pii
+    
+    flush_pending_writes()
+    # Fixed query text with a bound modifier lets SQLite reuse the
+    # prepared statements across requests
+    params = (f'-{days_back} days',)
+    session_query = _EXPORT_SESSIONS_PII_SQL if include_pii else _EXPORT_SESSIONS_SQL
+    
+    # Rows are encoded and sent in batches straight off the cursor,
+    # so memory stays flat however many days are exported
+    body = _generate_export(session_query, params, days_back, include_pii)
+    headers = {'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        body = _gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(
+        stream_with_context(body),
+        mimetype='application/json',
+        headers=headers
+    )
 
 @app.route('/api/dca/feedback/status', methods=['GET'])
+@cached_response
 def get_feedback_system_status():
     """Get current status of the feedback system"""
     
@@ -363,7 +730,7 @@ def get_feedback_system_status():
     # Test database connectivity
     if feedback_collector:
         try:
-            with sqlite3.connect(feedback_collector.db_path) as conn:
+            with get_conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT 1")
                 status['database_accessible'] = True
@@ -374,18 +741,28 @@ def get_feedback_system_status():
     return jsonify({
         'success': True,
         'status': status,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now(timezone.utc)
     })
 
 if __name__ == '__main__':
-    print("🔥 DCA Feedback Web API")
-    print("=" * 40)
+    configure_logging()
+    logger.info("🔥 DCA Feedback Web API")
     
     # Initialize feedback system
     if initialize_feedback_system():
-        print("✅ Feedback system ready")
-        print("🚀 Starting web server...")
-        app.run(debug=True, port=5002)
+        logger.info("✅ Feedback system ready")
+        port = int(os.environ.get('PORT', 5002))
+        if os.environ.get('FLASK_DEBUG') == '1':
+            logger.info("🚀 Starting development server...")
+            app.run(debug=True, port=port)
+        else:
+            # Requests are short SQLite round trips that release the GIL,
+            # so a thread pool sized to the connection pool keeps them
+            # overlapping without an async rewrite
+            from waitress import serve
+            threads = int(os.environ.get('THREADS', POOL_SIZE))
+            logger.info("🚀 Starting Waitress server (%d threads)...", threads)
+            serve(app, host='0.0.0.0', port=port, threads=threads)
     else:
-        print("❌ Failed to start feedback system")
-        print("💡 Check dca_feedback_system.py dependencies")
+        logger.error("❌ Failed to start feedback system")
+        logger.error("💡 Check dca_feedback_system.py dependencies")
@@ -0,0 +1,13 @@
+"""
+WSGI entry point for the DCA feedback API
+
+    gunicorn -k gthread --threads 8 -w 2 dca_feedback_wsgi:app
+    waitress-serve --port=5002 dca_feedback_wsgi:app
+"""
+from dca_feedback_api import app, configure_logging, initialize_feedback_system
+
+configure_logging()
+if not initialize_feedback_system():
+    raise RuntimeError("DCA feedback system failed to initialize")
+
+__all__ = ['app']
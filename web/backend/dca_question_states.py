@@ -4,6 +4,7 @@ DCA Question States and Evaluation System
 Defines question states, choices, and consequences for DCA training
 """
 
+from dataclasses import asdict, dataclass, field, fields, replace
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 import numpy as np
@@ -15,18 +16,35 @@ class ScenarioState(Enum):
     DELAYED_RESPONSE = "delayed_response"
     OPTIMAL_RESPONSE = "optimal_response"
 
+@dataclass(slots=True)
+class DCAScenarioState:
+    """Live fire scenario state threaded through evaluate_choice"""
+    fire_location: Optional[str] = None
+    smoke_condition: str = "none"  # none, light, moderate, heavy
+    time_elapsed: int = 0
+    compartments_affected: List[str] = field(default_factory=list)
+    boundaries_set: bool = False
+    investigators_deployed: bool = False
+    fedfire_arrived: bool = False
+
+    def replace(self, **changes) -> "DCAScenarioState":
+        """Return a copy with the given fields changed"""
+        return replace(self, **changes)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DCAScenarioState":
+        """Build from a JSON-decoded dict, ignoring unknown keys"""
+        return cls(**{k: data[k] for k in _SCENARIO_STATE_FIELDS if k in data})
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+_SCENARIO_STATE_FIELDS = tuple(f.name for f in fields(DCAScenarioState))
+
 class DCAQuestionStates:
     def __init__(self):
         # Define base states for fire scenarios
-        self.base_states = {
-            "fire_location": None,
-            "smoke_condition": "none",  # none, light, moderate, heavy
-            "time_elapsed": 0,
-            "compartments_affected": [],
-            "boundaries_set": False,
-            "investigators_deployed": False,
-            "fedfire_arrived": False
-        }
+        self.base_states = DCAScenarioState()
 
         # Define question states and their consequences
         self.question_states = {
@@ -82,33 +100,71 @@ class DCAQuestionStates:
             }
         }
 
-    def evaluate_choice(self, question_id: str, choice: str, current_state: Dict) -> Dict:
+        self._build_consequence_tables()
+
+    def _build_consequence_tables(self):
+        """
+        Flatten question_states into integer-indexed tables so
+        evaluate_choice is a couple of array lookups per request
+        """
+        self._qid_to_idx = {qid: i for i, qid in enumerate(self.question_states)}
+        labels = sorted({
+            choice
+            for question in self.question_states.values()
+            for choice in question["consequences"]
+        })
+        self._choice_labels = labels
+        self._choice_to_idx = {choice: i for i, choice in enumerate(labels)}
+
+        shape = (len(self._qid_to_idx), len(labels))
+        self._valid = np.zeros(shape, dtype=np.bool_)
+        self._time_penalty = np.zeros(shape, dtype=np.int32)
+        self._risk = np.zeros(shape, dtype=np.float32)
+        self._explanations = np.empty(shape, dtype=object)
+        self._optimal = np.zeros(shape[0], dtype=np.int8)
+        self._consequences = [[None] * shape[1] for _ in range(shape[0])]
+        self._state_changes = [[None] * shape[1] for _ in range(shape[0])]
+
+        for qid, qi in self._qid_to_idx.items():
+            question = self.question_states[qid]
+            self._optimal[qi] = self._choice_to_idx[question["optimal_choice"]]
+            for choice, consequence in question["consequences"].items():
+                ci = self._choice_to_idx[choice]
+                self._valid[qi, ci] = True
+                self._time_penalty[qi, ci] = consequence["time_penalty"]
+                self._risk[qi, ci] = consequence["risk_increase"]
+                self._explanations[qi, ci] = consequence["explanation"]
+                self._consequences[qi][ci] = consequence
+                self._state_changes[qi][ci] = consequence["state_changes"]
+
+    def evaluate_choice(self, question_id: str, choice: str,
+                        current_state: DCAScenarioState) -> Dict:
         """
         Evaluate a user's choice for a specific question
         Returns consequences and new state
         """
-        if question_id not in self.question_states:
+        qi = self._qid_to_idx.get(question_id)
+        if qi is None:
             raise ValueError(f"Unknown question ID: {question_id}")
 
-        question = self.question_states[question_id]
-        if choice not in question["consequences"]:
+        ci = self._choice_to_idx.get(choice)
+        if ci is None or not self._valid[qi, ci]:
             raise ValueError(f"Invalid choice {choice} for question {question_id}")
 
-        consequence = question["consequences"][choice]
+        optimal_idx = int(self._optimal[qi])
         
         # Create new state by applying consequences
-        new_state = current_state.copy()
-        new_state["time_elapsed"] += consequence["time_penalty"]
-        
-        for key, value in consequence["state_changes"].items():
-            new_state[key] = value
+        new_state = current_state.replace(
+            time_elapsed=current_state.time_elapsed + int(self._time_penalty[qi, ci]),
+            **self._state_changes[qi][ci]
+        )
 
         return {
             "selected": choice,
-            "optimal": question["optimal_choice"],
-            "consequence": consequence,
+            "optimal": self._choice_labels[optimal_idx],
+            "consequence": self._consequences[qi][ci],
             "new_state": new_state,
-            "is_optimal": choice == question["optimal_choice"]
+            "is_optimal": ci == optimal_idx
         }
 
     def get_question_details(self, question_id: str) -> Dict:
@@ -118,10 +174,10 @@ class DCAQuestionStates:
         
         return self.question_states[question_id]
 
-    def initialize_scenario_state(self, fire_location: str) -> Dict:
+    def initialize_scenario_state(self, fire_location: str) -> DCAScenarioState:
         """Initialize a new scenario state"""
-        state = self.base_states.copy()
-        state["fire_location"] = fire_location
-        state["compartments_affected"] = [fire_location]
-        state["smoke_condition"] = "light"
-        return state
+        return self.base_states.replace(
+            fire_location=fire_location,
+            compartments_affected=[fire_location],
+            smoke_condition="light"
+        )
@@ -8,12 +8,46 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
-from typing import Dict, List
-from dca_question_states import DCAQuestionStates, ScenarioState
+import threading
+from typing import Dict, List, Optional, Tuple
+from dca_question_states import DCAQuestionStates, DCAScenarioState, ScenarioState
+
+try:
+    import numba
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+SMOKE_LEVELS = ("none", "light", "moderate", "heavy")
+_SMOKE_INDEX = {level: i for i, level in enumerate(SMOKE_LEVELS)}
+STATE_DIM = 8
+CHOICES = ("A", "B", "C", "D")
+_CHOICE_INDEX = {choice: i for i, choice in enumerate(CHOICES)}
+
+
+def _fill_state_features(fire_location, smoke_idx, time_elapsed,
+                         n_compartments, boundaries, investigators,
+                         fedfire, out):
+    """Write the encoded scenario state into a float32 buffer"""
+    out[0] = 1.0 if fire_location else 0.0
+    out[1] = smoke_idx
+    out[2] = time_elapsed / 60  # Normalize time to hours
+    out[3] = n_compartments
+    out[4] = 1.0 if boundaries else 0.0
+    out[5] = 1.0 if investigators else 0.0
+    out[6] = 1.0 if fedfire else 0.0
+    out[7] = 0.0  # Reserved for future use
+
+
+if _NUMBA_AVAILABLE:
+    _fill_state_features = numba.njit(cache=True)(_fill_state_features)
+    # Compile at import so the first request does not pay for it
+    _fill_state_features(True, 0, 0.0, 0, False, False, False,
+                         np.empty(STATE_DIM, dtype=np.float32))
 
 
 class DCAResponseEvaluator(nn.Module):
-    def __init__(self, state_dim: int = 8, action_dim: int = 4):
+    def __init__(self, state_dim: int = STATE_DIM, action_dim: int = len(CHOICES)):
         super(DCAResponseEvaluator, self).__init__()
         
         self.state_dim = state_dim
@@ -27,29 +61,64 @@ class DCAResponseEvaluator(nn.Module):
         # Question states manager
         self.question_states = DCAQuestionStates()
 
+        # Per-thread feature buffers reused across evaluate_response calls
+        self._local = threading.local()
+
+        # Optimized copy of the network used for serving, see
+        # prepare_for_serving()
+        self._serving_net = None
+
     def forward(self, x):
         x = F.relu(self.fc1(x))
         x = F.relu(self.fc2(x))
         return self.fc3(x)
 
-    def encode_state(self, state: Dict) -> torch.Tensor:
-        """Convert scenario state to tensor"""
-        # Encode various state elements
-        encoded = [
-            1 if state["fire_location"] else 0,
-            ["none", "light", "moderate", "heavy"].index(state["smoke_condition"]),
-            state["time_elapsed"] / 60,  # Normalize time to hours
-            len(state["compartments_affected"]),
-            1 if state["boundaries_set"] else 0,
-            1 if state["investigators_deployed"] else 0,
-            1 if state["fedfire_arrived"] else 0,
-            0  # Reserved for future use
-        ]
-        return torch.FloatTensor(encoded)
+    def prepare_for_serving(self):
+        """
+        Build an int8 dynamically quantized TorchScript copy of the network
+        for evaluate_response. Call after loading trained weights.
+        """
+        self.eval()
+        net = nn.Sequential(self.fc1, nn.ReLU(), self.fc2, nn.ReLU(), self.fc3)
+        net = torch.ao.quantization.quantize_dynamic(
+            net, {nn.Linear}, dtype=torch.qint8
+        )
+        self._serving_net = torch.jit.script(net)
+
+    def encode_state(self, state: DCAScenarioState,
+                     out: Optional[np.ndarray] = None) -> torch.Tensor:
+        """
+        Convert scenario state to tensor. When `out` is given the features
+        are written into it and the returned tensor shares its memory.
+        """
+        if out is None:
+            out = np.empty(self.state_dim, dtype=np.float32)
+        smoke = state.smoke_condition
+        if smoke not in _SMOKE_INDEX:
+            raise ValueError(f"Unknown smoke condition: {smoke}")
+        _fill_state_features(
+            bool(state.fire_location),
+            _SMOKE_INDEX[smoke],
+            float(state.time_elapsed),
+            len(state.compartments_affected),
+            bool(state.boundaries_set),
+            bool(state.investigators_deployed),
+            bool(state.fedfire_arrived),
+            out
+        )
+        return torch.from_numpy(out)
+
+    def _feature_buffer(self) -> np.ndarray:
+        """Feature buffer owned by the calling thread"""
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = np.empty(self.state_dim, dtype=np.float32)
+            self._local.buf = buf
+        return buf
 
     def evaluate_response(self, question_id: str, 
                          choice: str, 
-                         current_state: Dict) -> Dict:
+                         current_state: DCAScenarioState) -> Dict:
         """
         Evaluate a response using both DQN and predefined states
         """
@@ -59,27 +128,63 @@ class DCAResponseEvaluator(nn.Module):
         )
         
         # Get DQN evaluation
-        state_tensor = self.encode_state(current_state)
-        with torch.no_grad():
-            action_values = self(state_tensor)
+        state_tensor = self.encode_state(current_state, self._feature_buffer())
+        net = self._serving_net if self._serving_net is not None else self
+        with torch.inference_mode():
+            action_values = net(state_tensor.unsqueeze(0))[0]
             
-        # Convert choice to index
-        choice_idx = ord(choice) - ord('A')
-        choice_value = action_values[choice_idx].item()
-        
-        # Get best action according to DQN
-        best_action = chr(ord('A') + torch.argmax(action_values).item())
+            # Convert choice to index
+            choice_idx = _CHOICE_INDEX[choice]
+            choice_value = action_values[choice_idx].item()
+            
+            # Get best action according to DQN
+            best_action = CHOICES[int(action_values.argmax())]
+            confidence = action_values.softmax(0)[choice_idx].item()
         
         # Combine evaluations
         evaluation = {
             **base_eval,
             "dqn_value": choice_value,
             "dqn_best_action": best_action,
-            "confidence": F.softmax(action_values, dim=0)[choice_idx].item()
+            "confidence": confidence
         }
         
         return evaluation
 
+    def evaluate_responses(self, items: List[Tuple[str, str, DCAScenarioState]]) -> List[Dict]:
+        """
+        Evaluate several (question_id, choice, state) responses with one
+        batched forward pass. Results match evaluate_response per item up
+        to float rounding; the quantized serving network scales activations
+        per batch, so its DQN values can differ slightly from single calls.
+        """
+        n = len(items)
+        if not n:
+            return []
+        
+        states = np.empty((n, self.state_dim), dtype=np.float32)
+        for row, (_, _, state) in zip(states, items):
+            self.encode_state(state, row)
+        rows = torch.arange(n)
+        choice_idx = torch.tensor([_CHOICE_INDEX[choice] for _, choice, _ in items])
+        
+        net = self._serving_net if self._serving_net is not None else self
+        with torch.inference_mode():
+            action_values = net(torch.from_numpy(states))
+            choice_values = action_values[rows, choice_idx].tolist()
+            best_actions = action_values.argmax(dim=1).tolist()
+            confidences = action_values.softmax(1)[rows, choice_idx].tolist()
+        
+        return [
+            {
+                **self.question_states.evaluate_choice(question_id, choice, state),
+                "dqn_value": choice_values[i],
+                "dqn_best_action": CHOICES[best_actions[i]],
+                "confidence": confidences[i]
+            }
+            for i, (question_id, choice, state) in enumerate(items)
+        ]
+
     def get_consequences(self, evaluation: Dict) -> str:
         """Generate consequence message based on evaluation"""
         consequence = evaluation["consequence"]
@@ -5,13 +5,19 @@ Integrates enhanced DQN with web-based fire response training
 """
 
 import json
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 import numpy as np
 from pathlib import Path
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dca_api import dca_api
+from json_provider import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Register DCA API blueprint
@@ -21,10 +27,112 @@ app.register_blueprint(dca_api)
 enhanced_env = None
 enhanced_agent = None
 current_session = {}
+# Built once from enhanced_env.scenarios, which is fixed after initialization
+scenario_index = {}
+scenario_library = None
+# Waitress serves requests from a thread pool; the environment and the
+# session it drives are mutated together, so those updates are serialized.
+# Inference runs outside the lock on a snapshot of the session state
+_session_lock = threading.Lock()
+
+# Recommendation requests are queued and answered by a single worker thread,
+# which runs one batched forward pass over everything queued while the
+# previous batch was running (at most RECOMMENDATION_BATCH states)
+RECOMMENDATION_BATCH = 32
+# A request waits this long for the worker before running its own forward pass
+RECOMMENDATION_TIMEOUT = 2.0
+_recommendation_queue = queue.Queue()
+_recommendation_worker = None
+
+def _recommendation_worker_loop():
+    """Answer queued recommendation requests in batches"""
+    while True:
+        batch = [_recommendation_queue.get()]
+        while len(batch) < RECOMMENDATION_BATCH:
+            try:
+                batch.append(_recommendation_queue.get_nowait())
+            except queue.Empty:
+                break
+        # Requests that timed out cancelled their futures and answered themselves
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            continue
+        try:
+            actions = enhanced_agent.select_actions(
+                np.stack([state for state, _, _ in batch]),
+                np.array([source_id for _, source_id, _ in batch])
+            )
+            for (_, _, future), action in zip(batch, actions):
+                future.set_result(int(action))
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+
+def _start_recommendation_worker():
+    """Start the background recommendation worker once"""
+    global _recommendation_worker
+    if _recommendation_worker is None or not _recommendation_worker.is_alive():
+        _recommendation_worker = threading.Thread(
+            target=_recommendation_worker_loop, name='recommendation-worker', daemon=True
+        )
+        _recommendation_worker.start()
+
+def recommend_action(state: np.ndarray, source_id: int) -> int:
+    """Queue a state for the batched DQN forward pass and wait for its action"""
+    if _recommendation_worker is None or not _recommendation_worker.is_alive():
+        return enhanced_agent.select_action(state, source_id)
+    future = Future()
+    _recommendation_queue.put((state, source_id, future))
+    try:
+        return future.result(timeout=RECOMMENDATION_TIMEOUT)
+    except FutureTimeout:
+        # Withdraw the request if it is still queued; a late batch result
+        # for it is simply discarded
+        future.cancel()
+        print("⚠️  Recommendation worker busy, using a direct forward pass")
+        return enhanced_agent.select_action(state, source_id)
+
+def build_scenario_index(scenarios):
+    """Index scenarios by lowercased (source, category), with None as a wildcard"""
+    index = {}
+    for scenario in scenarios:
+        source = scenario.get('source', '').lower()
+        category = scenario.get('category', '').lower()
+        for key in ((source, category), (source, None), (None, category)):
+            index.setdefault(key, []).append(scenario)
+    return index
+
+def build_scenario_library(scenarios):
+    """Summarize scenario counts by source and category, plus a few samples"""
+    library = {
+        'total_scenarios': len(scenarios),
+        'sources': {},
+        'categories': {},
+        'sample_scenarios': []
+    }
+    
+    # Group by source
+    for scenario in scenarios:
+        source = scenario.get('source', 'unknown')
+        category = scenario.get('category', 'unknown')
+        library['sources'][source] = library['sources'].get(source, 0) + 1
+        library['categories'][category] = library['categories'].get(category, 0) + 1
+    
+    # Add sample scenarios (first 5)
+    for scenario in scenarios[:5]:
+        library['sample_scenarios'].append({
+            'title': scenario.get('title', 'Untitled'),
+            'source': scenario.get('source', 'unknown'),
+            'category': scenario.get('category', 'unknown'),
+            'difficulty': scenario.get('difficulty', 'medium'),
+            'situation': scenario.get('situation', '')[:200] + '...'
+        })
+    
+    return library
 
 def initialize_enhanced_system():
     """Initialize the enhanced DQN system"""
-    global enhanced_env, enhanced_agent
+    global enhanced_env, enhanced_agent, scenario_index, scenario_library
     
     try:
         from enhanced_dqn_system import (
@@ -33,23 +141,31 @@ def initialize_enhanced_system():
         )
         
         # Create environment
-        enhanced_env = EnhancedFireResponseEnvironment()
+        env = EnhancedFireResponseEnvironment()
+        index = build_scenario_index(env.scenarios)
+        library = build_scenario_library(env.scenarios)
         
         # Create agent
-        enhanced_agent = EnhancedDQNAgent(
-            state_dim=enhanced_env.state_dim,
-            action_dim=enhanced_env.action_dim
+        agent = EnhancedDQNAgent(
+            state_dim=env.state_dim,
+            action_dim=env.action_dim
         )
         
         # Try to load trained model
         model_path = Path(__file__).parent / "models" / "enhanced_dqn_final.pth"
         if model_path.exists():
-            enhanced_agent.load_model(str(model_path))
-            enhanced_agent.epsilon = 0.1  # Small exploration for variety
+            agent.load_model(str(model_path))
+            agent.epsilon = 0.1  # Small exploration for variety
             print("✅ Enhanced DQN system initialized with trained model")
         else:
             print("⚠️  Enhanced DQN system initialized without trained model")
         
+        # The worker is running before any request can see the agent
+        _start_recommendation_worker()
+        scenario_index = index
+        scenario_library = library
+        enhanced_env = env
+        enhanced_agent = agent
         return True
         
     except Exception as e:
@@ -73,41 +189,35 @@ def start_enhanced_session():
         preferred_category = data.get('category', None)  # fire, emergency, etc.
         
         # Filter scenarios if preferences specified
-        available_scenarios = enhanced_env.scenarios
-        
-        if preferred_source:
-            available_scenarios = [
-                s for s in available_scenarios
-                if s.get('source', '').lower() == preferred_source.lower()
-            ]
-        
-        if preferred_category:
-            available_scenarios = [
-                s for s in available_scenarios
-                if s.get('category', '').lower() == preferred_category.lower()
-            ]
-        
-        if not available_scenarios:
-            available_scenarios = enhanced_env.scenarios  # Fallback
+        key = (
+            preferred_source.lower() if preferred_source else None,
+            preferred_category.lower() if preferred_category else None
+        )
+        available_scenarios = scenario_index.get(key) or enhanced_env.scenarios  # Fallback
         
         # Select random scenario
         import random
         selected_scenario = random.choice(available_scenarios)
-        enhanced_env.current_scenario = selected_scenario
-        
-        # Reset environment
-        state, source_id = enhanced_env.reset()
         
-        # Store session data
-        current_session = {
-            'scenario': selected_scenario,
-            'state': state.tolist(),
-            'source_id': source_id,
-            'step': 0,
-            'total_reward': 0,
-            'actions_taken': [],
-            'completed': False
-        }
+        with _session_lock:
+            enhanced_env.current_scenario = selected_scenario
+            
+            # Reset environment
+            state, source_id = enhanced_env.reset()
+            
+            # Store session data. The state is kept as a float32 ndarray (the
+            # dtype the DQN consumes) and copied, since the environment
+            # updates its own state array in place; it is replaced, never
+            # mutated, so readers can use it without copying
+            current_session = {
+                'scenario': selected_scenario,
+                'state': state.astype(np.float32),
+                'source_id': source_id,
+                'step': 0,
+                'total_reward': 0,
+                'actions_taken': [],
+                'completed': False
+            }
         
         return jsonify({
             'success': True,
@@ -135,11 +245,12 @@ def get_enhanced_recommendation():
     
     try:
         # Get current state
-        state = np.array(current_session['state'])
-        source_id = current_session['source_id']
+        with _session_lock:
+            state = current_session['state']
+            source_id = current_session['source_id']
         
-        # Get agent recommendation
-        recommended_action = enhanced_agent.select_action(state, source_id)
+        # Get agent recommendation, batched with concurrent requests
+        recommended_action = recommend_action(state, source_id)
         
         # Get action confidence (based on Q-values if available)
         confidence = 0.8  # Default confidence
@@ -168,41 +279,40 @@ def take_enhanced_action():
         if action is None:
             return jsonify({'error': 'Action required'}), 400
         
-        # Get current state
-        state = np.array(current_session['state'])
-        source_id = current_session['source_id']
-        
-        # Take action in environment
-        next_state, reward, done, info = enhanced_env.step(action, source_id)
-        
-        # Update session
-        current_session['state'] = next_state.tolist()
-        current_session['step'] += 1
-        current_session['total_reward'] += reward
-        current_session['actions_taken'].append(action)
-        current_session['completed'] = done
-        
-        # Prepare response
-        response = {
-            'reward': float(reward),
-            'done': done,
-            'step': current_session['step'],
-            'total_reward': current_session['total_reward'],
-            'feedback': info.get('feedback', 'Action completed'),
-            'next_state': next_state.tolist()
-        }
-        
-        # Add completion summary if done
-        if done:
-            response['summary'] = {
-                'total_steps': current_session['step'],
-                'final_reward': current_session['total_reward'],
-                'performance_rating': get_performance_rating(
-                    current_session['total_reward']
-                ),
-                'scenario_source': current_session['scenario'].get('source'),
-                'scenario_category': current_session['scenario'].get('category')
+        with _session_lock:
+            source_id = current_session['source_id']
+            
+            # Take action in environment
+            next_state, reward, done, info = enhanced_env.step(action, source_id)
+            
+            # Update session
+            current_session['state'] = next_state.astype(np.float32)
+            current_session['step'] += 1
+            current_session['total_reward'] += reward
+            current_session['actions_taken'].append(action)
+            current_session['completed'] = done
+            
+            # Prepare response
+            response = {
+                'reward': float(reward),
+                'done': done,
+                'step': current_session['step'],
+                'total_reward': current_session['total_reward'],
+                'feedback': info.get('feedback', 'Action completed'),
+                'next_state': next_state.tolist()
             }
+            
+            # Add completion summary if done
+            if done:
+                response['summary'] = {
+                    'total_steps': current_session['step'],
+                    'final_reward': current_session['total_reward'],
+                    'performance_rating': get_performance_rating(
+                        current_session['total_reward']
+                    ),
+                    'scenario_source': current_session['scenario'].get('source'),
+                    'scenario_category': current_session['scenario'].get('category')
+                }
         
         return jsonify(response)
         
@@ -217,38 +327,8 @@ def get_scenario_library():
         return jsonify({'error': 'Enhanced system not initialized'}), 500
     
     try:
-        # Organize scenarios by source and category
-        library = {
-            'total_scenarios': len(enhanced_env.scenarios),
-            'sources': {},
-            'categories': {},
-            'sample_scenarios': []
-        }
-        
-        # Group by source
-        for scenario in enhanced_env.scenarios:
-            source = scenario.get('source', 'unknown')
-            category = scenario.get('category', 'unknown')
-            
-            if source not in library['sources']:
-                library['sources'][source] = 0
-            library['sources'][source] += 1
-            
-            if category not in library['categories']:
-                library['categories'][category] = 0
-            library['categories'][category] += 1
-        
-        # Add sample scenarios (first 5)
-        for scenario in enhanced_env.scenarios[:5]:
-            library['sample_scenarios'].append({
-                'title': scenario.get('title', 'Untitled'),
-                'source': scenario.get('source', 'unknown'),
-                'category': scenario.get('category', 'unknown'),
-                'difficulty': scenario.get('difficulty', 'medium'),
-                'situation': scenario.get('situation', '')[:200] + '...'
-            })
-        
-        return jsonify(library)
+        # Organized by source and category once, at initialization
+        return jsonify(scenario_library)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -295,8 +375,17 @@ if __name__ == '__main__':
         print("✅ Enhanced system ready")
         print(f"📚 Scenarios loaded: {len(enhanced_env.scenarios)}")
         print(f"🎯 Training sources: {list(enhanced_env.source_map.keys())}")
-        print("🚀 Starting web server...")
-        app.run(debug=True, port=5001)
+        port = int(os.environ.get('PORT', 5001))
+        if os.environ.get('FLASK_DEBUG') == '1':
+            print("🚀 Starting development server...")
+            app.run(debug=True, port=port)
+        else:
+            # DQN inference releases the GIL inside torch, so a thread pool
+            # lets one slow forward pass overlap with other requests
+            from waitress import serve
+            threads = int(os.environ.get('THREADS', 8))
+            print(f"🚀 Starting Waitress server ({threads} threads)...")
+            serve(app, host='0.0.0.0', port=port, threads=threads)
     else:
         print("❌ Failed to start enhanced system")
         print("💡 Try running train_enhanced_dqn.py first")
@@ -9,12 +9,25 @@ from feedback_api import app
 import os
 
 if __name__ == '__main__':
-    # Get port from environment variable or use default
+    # Get port and worker threads from environment or use defaults
     port = int(os.environ.get('PORT', 5002))
+    threads = int(os.environ.get('THREADS', 8))
     
     print("🚀 Starting DCA Feedback API Production Server")
     print(f"📡 Listening on port {port}")
-    print("💻 Using Waitress WSGI server")
+    print(f"💻 Using Waitress WSGI server ({threads} threads)")
     
-    # Start Waitress server
-    serve(app, host='0.0.0.0', port=port, threads=4)
+    # Start Waitress server, tuned for many short JSON requests:
+    # poll() instead of select() lifts the 1024 FD cap, and idle
+    # keep-alive channels are reaped after 30s instead of 120s
+    serve(
+        app,
+        host='0.0.0.0',
+        port=port,
+        threads=threads,
+        connection_limit=1000,
+        cleanup_interval=10,
+        channel_timeout=30,
+        asyncore_use_poll=True,
+        outbuf_overflow=1048576
+    )
@@ -38,10 +38,14 @@ class DCAHandler(SimpleHTTPRequestHandler):
                 return
 
             # Submit and evaluate the answer
-            response_data = assessment_manager.submit_answer(
-                data['selectedAnswer'],
-                data['responseTime']
-            )
+            try:
+                response_data = assessment_manager.submit_answer(
+                    data['selectedAnswer'],
+                    data['responseTime']
+                )
+            except ValueError as e:
+                self._send_json({'error': str(e)}, 400)
+                return
 
             # Get DQN evaluation
             evaluation = evaluator.evaluate_response(
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Test script for the DCA feedback collector and API batch paths
+
+Runs against throwaway databases in a temporary directory.
+"""
+import gzip
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import orjson
+
+from dca_feedback_system import DCAFeedbackCollector, DCAModelRetrainer
+
+_workdir = tempfile.mkdtemp(prefix="dca_feedback_test_")
+_api = None
+
+
+def _feedback_api():
+    """The API module, initialized once against a database in the temp dir"""
+    global _api
+    if _api is None:
+        os.chdir(_workdir)
+        import dca_feedback_api
+        assert dca_feedback_api.initialize_feedback_system()
+        # Every read below must see the writes made just before it
+        dca_feedback_api.CACHE_TTL = 0
+        _api = dca_feedback_api
+    return _api
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_buffered_writes_flush():
+    """Buffered rows land when the buffer fills, on the timer, and on close"""
+    db_path = os.path.join(_workdir, "buffered.db")
+    collector = DCAFeedbackCollector(db_path, flush_every=3, flush_interval=0.2)
+    session_id = collector.log_assessment_session({'user_id': 'tester'})
+    
+    for step in range(2):
+        collector.log_assessment_action({'session_id': session_id, 'step_number': step})
+    assert _count(db_path, 'assessment_actions') == 0
+    collector.log_assessment_action({'session_id': session_id, 'step_number': 2})
+    assert _count(db_path, 'assessment_actions') == 3
+    
+    collector.collect_user_feedback({'session_id': session_id, 'feedback_rating': 4})
+    time.sleep(0.6)
+    assert _count(db_path, 'user_feedback') == 1
+    
+    collector.log_assessment_action({'session_id': session_id, 'step_number': 3})
+    collector.close()
+    assert _count(db_path, 'assessment_actions') == 4
+    print("✅ Buffered writes flush on size, timer and close")
+
+
+def test_buffered_writes_reject_bad_rows():
+    """A row that cannot be stored raises at the call and is never buffered"""
+    db_path = os.path.join(_workdir, "invalid.db")
+    with DCAFeedbackCollector(db_path) as collector:
+        for bad in ({'step_number': {'nested': 1}}, {'user_action': [1]}, 'not a dict'):
+            try:
+                collector.log_assessment_action(bad)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"log_assessment_action accepted {bad!r}")
+        assert collector.log_assessment_action({'step_number': '7'})
+    assert _count(db_path, 'assessment_actions') == 1
+    print("✅ Invalid rows are rejected before buffering")
+
+
+def test_buffered_writes_survive_failed_flush():
+    """A failed flush keeps rows held up by a lock and drops rows that can never be written"""
+    db_path = os.path.join(_workdir, "failures.db")
+    collector = DCAFeedbackCollector(db_path, flush_every=100, flush_interval=0)
+    collector.conn.execute("PRAGMA busy_timeout = 0")
+    
+    # Database locked by another writer: nothing is lost, the rows wait
+    action_ids = [collector.log_assessment_action({'step_number': step}) for step in range(3)]
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    collector.flush()
+    blocker.execute("ROLLBACK")
+    assert _count(db_path, 'assessment_actions') == 0
+    collector.flush()
+    assert _count(db_path, 'assessment_actions') == 3
+    
+    # A row whose key is already taken is dropped; its batch still lands
+    taken = collector.log_assessment_action({'step_number': 10})
+    collector.log_assessment_action({'step_number': 11})
+    blocker.execute(
+        "INSERT INTO assessment_actions (action_id, step_number) VALUES (?, -1)", (taken,)
+    )
+    collector.flush()
+    
+    # A failure no retry can fix drops the rows instead of re-arming forever
+    blocker.execute("DROP TABLE user_feedback")
+    collector.collect_user_feedback({'feedback_rating': 1})
+    collector.flush()
+    assert collector._feedback_buffer == []
+    blocker.close()
+    collector.close()
+    
+    with sqlite3.connect(db_path) as conn:
+        steps = sorted(row[0] for row in conn.execute("SELECT step_number FROM assessment_actions"))
+        stored_ids = {row[0] for row in conn.execute("SELECT action_id FROM assessment_actions")}
+    assert steps == [-1, 0, 1, 2, 11], steps
+    assert set(action_ids) <= stored_ids
+    print("✅ Failed flushes keep locked rows and drop unwritable ones")
+
+
+def test_log_actions_bulk():
+    """The bulk endpoint writes every action, or none when one is invalid"""
+    api = _feedback_api()
+    client = api.app.test_client()
+    session_id = client.post('/api/dca/feedback/start_session',
+                             json={'user_id': 'bulk'}).get_json()['session_id']
+    before = client.get('/api/dca/feedback/metrics').get_json()['metrics']['total_actions']
+    
+    actions = [
+        {'session_id': session_id, 'step_number': step, 'scenario_state': {'fire_type': step},
+         'ai_recommendation': step % 3, 'user_action': step % 2}
+        for step in range(40)
+    ]
+    response = client.post('/api/dca/feedback/log_actions_bulk', json={'actions': actions})
+    assert response.status_code == 200
+    assert len(set(response.get_json()['action_ids'])) == 40
+    
+    response = client.post('/api/dca/feedback/log_actions_bulk', json={
+        'actions': [{'session_id': session_id}, {'session_id': session_id, 'user_action': [1]}]
+    })
+    assert response.status_code == 400
+    assert client.post('/api/dca/feedback/log_actions_bulk', json={'actions': 3}).status_code == 400
+    
+    after = client.get('/api/dca/feedback/metrics').get_json()['metrics']['total_actions']
+    assert after == before + 40, (before, after)
+    print("✅ log_actions_bulk writes all rows or none")
+
+
+def test_summary_triggers():
+    """The /metrics running totals follow inserts, updates and deletes"""
+    api = _feedback_api()
+    client = api.app.test_client()
+    
+    def metrics():
+        return client.get('/api/dca/feedback/metrics').get_json()['metrics']
+    
+    before = metrics()
+    session_id = client.post('/api/dca/feedback/start_session',
+                             json={'user_id': 'triggers'}).get_json()['session_id']
+    action_id = client.post('/api/dca/feedback/log_action',
+                            json={'session_id': session_id, 'step_number': 0}).get_json()['action_id']
+    for rating in (2, 5):
+        client.post('/api/dca/feedback/submit_feedback',
+                    json={'session_id': session_id, 'action_id': action_id, 'feedback_rating': rating})
+    
+    after = metrics()
+    assert after['total_sessions'] == before['total_sessions'] + 1
+    assert after['total_actions'] == before['total_actions'] + 1
+    assert after['total_feedback_items'] == before['total_feedback_items'] + 2
+    ratings = before['feedback_rating_distribution']
+    assert after['feedback_rating_distribution'].get('5', 0) == ratings.get('5', 0) + 1
+    
+    # Re-rate one feedback row and delete the action, behind the API's back
+    with api.get_conn() as conn, conn:
+        conn.execute("UPDATE user_feedback SET feedback_rating = 5 WHERE session_id = ? "
+                     "AND feedback_rating = 2", (session_id,))
+        conn.execute("DELETE FROM assessment_actions WHERE action_id = ?", (action_id,))
+    after = metrics()
+    assert after['feedback_rating_distribution'].get('5', 0) == ratings.get('5', 0) + 2
+    assert after['feedback_rating_distribution'].get('2', 0) == ratings.get('2', 0)
+    assert after['total_actions'] == before['total_actions']
+    print("✅ Summary triggers keep /metrics counts current")
+
+
+def test_streaming_gzip_export():
+    """The export streams in batches and gzips to the same document"""
+    api = _feedback_api()
+    client = api.app.test_client()
+    api.EXPORT_BATCH_SIZE = 3
+    
+    # Streamed bodies hold their request context until the response is closed
+    with client.get('/api/dca/feedback/export_data') as plain:
+        assert plain.status_code == 200
+        assert plain.headers.get('Content-Encoding') is None
+        plain_body = plain.data
+    with client.get('/api/dca/feedback/export_data', headers={'Accept-Encoding': 'gzip'}) as compressed:
+        assert compressed.headers.get('Content-Encoding') == 'gzip'
+        gzip_body = gzip.decompress(compressed.data)
+    
+    plain_data = orjson.loads(plain_body)['data']
+    gzip_data = orjson.loads(gzip_body)['data']
+    for data in (plain_data, gzip_data):
+        data['export_info'].pop('generated_at')
+    assert gzip_data == plain_data
+    assert len(plain_data['actions']) == plain_data['export_info']['total_actions'] > 3
+    assert api._pool.qsize() == api.POOL_SIZE
+    print("✅ Streaming export matches with and without gzip")
+
+
+def test_should_retrain_one_cheap_trigger():
+    """A short-circuited retrain check never reports a verdict the full check would change"""
+    db_path = os.path.join(_workdir, "retrain.db")
+    with DCAFeedbackCollector(db_path) as collector:
+        session_id = collector.log_assessment_session({'user_id': 'retrain'})
+        # Every recommendation overridden (low_accuracy) and rejected by an
+        # expert (poor_expert_validation, which only the full check sees)
+        for step in range(4):
+            action_id = collector.log_assessment_action({
+                'session_id': session_id, 'step_number': step,
+                'ai_recommendation': 1, 'user_action': 2, 'ai_confidence': 0.5
+            })
+            collector.collect_user_feedback({
+                'session_id': session_id, 'action_id': action_id,
+                'feedback_rating': 3, 'expert_validation': 'rejected'
+            })
+    
+    retrainer = DCAModelRetrainer(feedback_db=db_path)
+    should_retrain, report = retrainer.should_retrain_model(detailed=True)
+    assert should_retrain
+    assert report['triggers']['low_accuracy'] and report['triggers']['poor_expert_validation']
+    assert report['recommendation'] == "immediate"
+    
+    should_retrain, report = retrainer.should_retrain_model()
+    assert should_retrain
+    assert report['triggers'] == {'negative_feedback_trend': False, 'low_accuracy': True}
+    assert 'recommendation' not in report, report
+    print("✅ Cheap retrain check leaves an unsettled recommendation out")
+
+
+def main():
+    """Run every feedback test, reporting failures instead of stopping at the first"""
+    print("=" * 50)
+    print("DCA Feedback System Test")
+    print("=" * 50)
+    
+    tests = [
+        test_buffered_writes_flush,
+        test_buffered_writes_reject_bad_rows,
+        test_buffered_writes_survive_failed_flush,
+        test_log_actions_bulk,
+        test_summary_triggers,
+        test_streaming_gzip_export,
+        test_should_retrain_one_cheap_trigger
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+    
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed (databases in {_workdir})")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for the DCA assessment server
+
+    waitress-serve --port=5000 wsgi:app
+    gunicorn -w 4 -k gthread wsgi:app
+"""
+from app import app
+
+__all__ = ['app']
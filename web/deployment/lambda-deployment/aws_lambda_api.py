@@ -3,27 +3,53 @@ Shipboard Fire Response AI - AWS Lambda API Handler
 Simple API wrapper for the trained DQN model
 """
 
-import json
-import boto3
-import numpy as np
-import torch
 from typing import Dict, Any
-import pickle
-import base64
+
+import orjson
+
+def _body(obj: Any) -> str:
+    """Serialize a response body; API Gateway expects a str, not bytes"""
+    return orjson.dumps(obj).decode()
 
 class ShipboardFireResponseAPI:
     """AWS Lambda handler for Shipboard Fire Response AI"""
     
+    ACTIONS = [
+        "assess_situation",
+        "dispatch_small_team", 
+        "dispatch_large_team",
+        "call_fedfire",
+        "activate_foam_system",
+        "ship_recall",
+        "evacuate_space",
+        "monitor_situation"
+    ]
+    
+    # (highest complexity, action, confidence, reasoning) per band
+    COMPLEXITY_BANDS = [
+        (3, "dispatch_small_team", 0.92, "Low complexity fire can be handled by small team"),
+        (6, "dispatch_large_team", 0.88, "Medium complexity requires larger response team"),
+        (8, "call_fedfire", 0.85, "High complexity needs professional fire department"),
+        (10, "ship_recall", 0.90, "Critical situation requires all-hands response")
+    ]
+    
     def __init__(self):
         self.model = None
         self.scenarios = None
         self._load_model()
         self._load_scenarios()
+        
+        # Prediction for every complexity 0-10, so lookups need no comparisons
+        self._complexity_table = [
+            next(band[1:] for band in self.COMPLEXITY_BANDS if complexity <= band[0])
+            for complexity in range(11)
+        ]
     
     def _load_model(self):
         """Load the trained DQN model"""
         try:
-            # In production, load from S3
+            # In production, load from S3; import boto3/torch here rather
+            # than at module level to keep them off the cold-start path
             # For now, we'll use a simplified approach
             self.model_loaded = True
             print("Model loaded successfully")
@@ -63,6 +89,10 @@ class ShipboardFireResponseAPI:
                 "complexity": 3
             }
         }
+        
+        # Scenarios are static, so their response body is serialized once
+        self._scenarios_body = _body(self.get_scenarios())
+        self._prediction_bodies = {}
     
     def predict_action(self, scenario_id: str) -> Dict[str, Any]:
         """Predict the best action for a given scenario"""
@@ -72,47 +102,29 @@ class ShipboardFireResponseAPI:
         
         scenario = self.scenarios[scenario_id]
         
-        # Simulate DQN prediction (replace with actual model inference)
-        actions = [
-            "assess_situation",
-            "dispatch_small_team", 
-            "dispatch_large_team",
-            "call_fedfire",
-            "activate_foam_system",
-            "ship_recall",
-            "evacuate_space",
-            "monitor_situation"
-        ]
-        
-        # Simple logic based on scenario complexity
-        complexity = scenario["complexity"]
-        
-        if complexity <= 3:
-            predicted_action = "dispatch_small_team"
-            confidence = 0.92
-            reasoning = "Low complexity fire can be handled by small team"
-        elif complexity <= 6:
-            predicted_action = "dispatch_large_team"
-            confidence = 0.88
-            reasoning = "Medium complexity requires larger response team"
-        elif complexity <= 8:
-            predicted_action = "call_fedfire"
-            confidence = 0.85
-            reasoning = "High complexity needs professional fire department"
-        else:
-            predicted_action = "ship_recall"
-            confidence = 0.90
-            reasoning = "Critical situation requires all-hands response"
+        # Simulate DQN prediction (replace with actual model inference):
+        # simple logic based on scenario complexity, clamped to the table
+        complexity = min(max(scenario["complexity"], 0), 10)
+        predicted_action, confidence, reasoning = self._complexity_table[complexity]
         
         return {
             "scenario": scenario,
             "predicted_action": predicted_action,
             "confidence": confidence,
             "reasoning": reasoning,
-            "all_actions": actions,
+            "all_actions": self.ACTIONS,
             "success_probability": confidence
         }
     
+    def prediction_body(self, scenario_id: str) -> str:
+        """JSON body for predict_action, cached per known scenario"""
+        body = self._prediction_bodies.get(scenario_id)
+        if body is None:
+            body = _body(self.predict_action(scenario_id))
+            if scenario_id in self.scenarios:
+                self._prediction_bodies[scenario_id] = body
+        return body
+    
     def get_scenarios(self) -> Dict[str, Any]:
         """Get all available scenarios"""
         return {
@@ -120,11 +132,21 @@ class ShipboardFireResponseAPI:
             "details": self.scenarios
         }
 
+# Built on the first invocation and reused while the container stays warm
+_api = None
+
+def _get_api() -> ShipboardFireResponseAPI:
+    """Return the container-wide API instance, creating it on first use"""
+    global _api
+    if _api is None:
+        _api = ShipboardFireResponseAPI()
+    return _api
+
 # AWS Lambda handler
 def lambda_handler(event, context):
     """Main Lambda function handler"""
     
-    api = ShipboardFireResponseAPI()
+    api = _get_api()
     
     try:
         # Parse the request
@@ -142,51 +164,47 @@ def lambda_handler(event, context):
             return {
                 'statusCode': 200,
                 'headers': headers,
-                'body': json.dumps({'message': 'CORS preflight'})
+                'body': _body({'message': 'CORS preflight'})
             }
         
         if http_method == 'GET' and path == '/scenarios':
             # Return available scenarios
-            result = api.get_scenarios()
-            
             return {
                 'statusCode': 200,
                 'headers': headers,
-                'body': json.dumps(result)
+                'body': api._scenarios_body
             }
         
         elif http_method == 'POST' and path == '/predict':
             # Predict action for scenario
-            body = json.loads(event.get('body', '{}'))
+            body = orjson.loads(event.get('body', '{}'))
             scenario_id = body.get('scenario_id')
             
             if not scenario_id:
                 return {
                     'statusCode': 400,
                     'headers': headers,
-                    'body': json.dumps({'error': 'scenario_id required'})
+                    'body': _body({'error': 'scenario_id required'})
                 }
             
-            result = api.predict_action(scenario_id)
-            
             return {
                 'statusCode': 200,
                 'headers': headers,
-                'body': json.dumps(result)
+                'body': api.prediction_body(scenario_id)
             }
         
         else:
             return {
                 'statusCode': 404,
                 'headers': headers,
-                'body': json.dumps({'error': 'Endpoint not found'})
+                'body': _body({'error': 'Endpoint not found'})
             }
             
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'error': str(e)})
+            'body': _body({'error': str(e)})
         }
 
 # Local testing
@@ -196,9 +214,9 @@ if __name__ == "__main__":
     # Test scenarios endpoint
     print("=== Testing Scenarios ===")
     scenarios = api.get_scenarios()
-    print(json.dumps(scenarios, indent=2))
+    print(orjson.dumps(scenarios, option=orjson.OPT_INDENT_2).decode())
     
     # Test prediction
     print("\n=== Testing Prediction ===")
     prediction = api.predict_action("engine_room_fuel")
-    print(json.dumps(prediction, indent=2))
+    print(orjson.dumps(prediction, option=orjson.OPT_INDENT_2).decode())
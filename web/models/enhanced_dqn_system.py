@@ -8,6 +8,7 @@ Uses multi-source scenario data for improved learning
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.utils.checkpoint import checkpoint
 import numpy as np
 import json
 from pathlib import Path
@@ -21,7 +22,8 @@ class EnhancedFireResponseDQN(nn.Module):
     """
     
     def __init__(self, state_dim: int, action_dim: int, 
-                 hidden_dim: int = 512, num_sources: int = 5):
+                 hidden_dim: int = 512, num_sources: int = 5,
+                 gradient_checkpointing: bool = False):
         super(EnhancedFireResponseDQN, self).__init__()
         
         self.state_dim = state_dim
@@ -69,6 +71,10 @@ class EnhancedFireResponseDQN(nn.Module):
         # Combined output
         self.final_layer = nn.Linear(action_dim, action_dim)
         
+        # Recompute the attention block in backward instead of storing its
+        # activations; trades compute for memory on large training batches
+        self.gradient_checkpointing = gradient_checkpointing
+        
         # Initialize weights
         self.apply(self._init_weights)
         
@@ -99,12 +105,10 @@ class EnhancedFireResponseDQN(nn.Module):
         encoded = self.state_encoder(enhanced_state)  # [batch_size, hidden_dim]
         
         # Apply self-attention for scenario complexity
-        attended, _ = self.attention(
-            encoded.unsqueeze(1), 
-            encoded.unsqueeze(1), 
-            encoded.unsqueeze(1)
-        )
-        attended = attended.squeeze(1)  # [batch_size, hidden_dim]
+        if self.gradient_checkpointing and self.training:
+            attended = checkpoint(self._attend, encoded, use_reentrant=False)
+        else:
+            attended = self._attend(encoded)  # [batch_size, hidden_dim]
         
         # Standards-specific processing
         nfpa_features = F.relu(self.nfpa_layer(attended))
@@ -125,6 +129,15 @@ class EnhancedFireResponseDQN(nn.Module):
         q_values = self.final_layer(combined_actions)
         
         return q_values
+    
+    def _attend(self, encoded: torch.Tensor) -> torch.Tensor:
+        """Self-attention over the encoded state"""
+        attended, _ = self.attention(
+            encoded.unsqueeze(1), 
+            encoded.unsqueeze(1), 
+            encoded.unsqueeze(1)
+        )
+        return attended.squeeze(1)
 
 class EnhancedFireResponseEnvironment:
     """
@@ -311,7 +324,8 @@ class EnhancedDQNAgent:
     def __init__(self, state_dim: int, action_dim: int, lr: float = 1e-3,
                  gamma: float = 0.99, epsilon: float = 1.0, 
                  epsilon_decay: float = 0.995, epsilon_min: float = 0.01,
-                 device: str = "cuda" if torch.cuda.is_available() else "cpu"):
+                 device: str = "cuda" if torch.cuda.is_available() else "cpu",
+                 gradient_checkpointing: bool = False):
         
         self.state_dim = state_dim
         self.action_dim = action_dim
@@ -323,7 +337,10 @@ class EnhancedDQNAgent:
         self.device = device
         
         # Enhanced networks
-        self.q_network = EnhancedFireResponseDQN(state_dim, action_dim).to(device)
+        # Only the online network is trained, so only it needs checkpointing
+        self.q_network = EnhancedFireResponseDQN(
+            state_dim, action_dim, gradient_checkpointing=gradient_checkpointing
+        ).to(device)
         self.target_network = EnhancedFireResponseDQN(state_dim, action_dim).to(device)
         
         # Optimizer
@@ -348,6 +365,24 @@ class EnhancedDQNAgent:
             q_values = self.q_network(state_tensor, source_tensor)
             return q_values.argmax().item()
     
+    def select_actions(self, states: np.ndarray, source_ids: np.ndarray) -> np.ndarray:
+        """Epsilon-greedy actions for a batch of states in one forward pass"""
+        states = np.asarray(states, dtype=np.float32)
+        source_ids = np.asarray(source_ids, dtype=np.int64)
+        
+        actions = np.empty(len(states), dtype=np.int64)
+        explore = np.random.random(len(states)) < self.epsilon
+        actions[explore] = np.random.randint(0, self.action_dim, int(explore.sum()))
+        
+        greedy = ~explore
+        if greedy.any():
+            with torch.no_grad():
+                state_tensor = torch.from_numpy(states[greedy]).to(self.device)
+                source_tensor = torch.from_numpy(source_ids[greedy]).to(self.device)
+                q_values = self.q_network(state_tensor, source_tensor)
+                actions[greedy] = q_values.argmax(dim=1).cpu().numpy()
+        return actions
+    
     def store_experience(self, state: np.ndarray, action: int, reward: float,
                         next_state: np.ndarray, done: bool, source_id: int,
                         next_source_id: int):
@@ -85,6 +85,43 @@ def test_basic_functionality():
         traceback.print_exc()
         return False
 
+def test_batched_action_selection():
+    """Test that select_actions agrees with per-state select_action"""
+    print("\n🧪 Testing Batched Action Selection...")
+    
+    try:
+        import numpy as np
+        from enhanced_dqn_system import EnhancedDQNAgent
+        
+        agent = EnhancedDQNAgent(state_dim=20, action_dim=9, device="cpu")
+        states = np.random.rand(16, 20).astype(np.float32)
+        source_ids = np.arange(16) % 5
+        
+        # Greedy, without dropout: one batched forward pass picks the same actions
+        agent.q_network.eval()
+        agent.epsilon = 0.0
+        batched = agent.select_actions(states, source_ids)
+        single = [agent.select_action(s, int(src)) for s, src in zip(states, source_ids)]
+        if batched.tolist() != single:
+            print(f"❌ Greedy batch {batched.tolist()} != per-state {single}")
+            return False
+        print(f"✅ Greedy batch matches per-state selection: {batched.tolist()}")
+        
+        # Fully exploring: every action is still a valid index
+        agent.epsilon = 1.0
+        explored = agent.select_actions(states, source_ids)
+        if len(explored) != len(states) or not ((explored >= 0) & (explored < 9)).all():
+            print(f"❌ Exploring batch out of range: {explored.tolist()}")
+            return False
+        print("✅ Exploring batch stays within the action space")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batched action selection test failed: {e}")
+        traceback.print_exc()
+        return False
+
 def main():
     """Main test function"""
     print("=" * 50)
@@ -101,6 +138,11 @@ def main():
         print("\n❌ Basic functionality tests failed.")
         return False
     
+    # Test batched action selection
+    if not test_batched_action_selection():
+        print("\n❌ Batched action selection tests failed.")
+        return False
+    
     print("\n🎯 All tests passed! Enhanced DQN system is ready.")
     return True
 
@@ -22,7 +22,8 @@ except ImportError:
     sys.exit(1)
 
 
-def train_enhanced_dqn(num_episodes: int = 1000, save_interval: int = 200):
+def train_enhanced_dqn(num_episodes: int = 1000, save_interval: int = 200,
+                       gradient_checkpointing: bool = False):
     """Train enhanced DQN agent with comprehensive scenarios"""
 
     print("🔥 Enhanced Fire Response DQN Training")
@@ -37,7 +38,8 @@ def train_enhanced_dqn(num_episodes: int = 1000, save_interval: int = 200):
         gamma=0.99,
         epsilon=1.0,
         epsilon_decay=0.997,
-        epsilon_min=0.05
+        epsilon_min=0.05,
+        gradient_checkpointing=gradient_checkpointing
     )
     
     print(f"📊 Environment: {env.state_dim} states, {env.action_dim} actions")
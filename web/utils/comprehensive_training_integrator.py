@@ -5,12 +5,15 @@ Processes multiple authoritative sources: NFPA, USCG, Navy RVSS
 Creates unified training database for Shipboard Fire Response AI
 """
 
-import json
+import orjson
 import os
 from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
 
+# Pretty-printed output keeps the generated files reviewable in git
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
 class ComprehensiveTrainingIntegrator:
     """Integrate multiple fire training standards into unified system"""
     
@@ -19,6 +22,9 @@ class ComprehensiveTrainingIntegrator:
         self.training_dir = self.base_dir / "training-data"
         self.training_dir.mkdir(exist_ok=True)
         
+        # Single creation timestamp shared by everything generated in this run
+        self.created_at = datetime.now().isoformat()
+        
         # Available training documents
         self.source_documents = {
             "nfpa_1500": {
@@ -157,7 +163,7 @@ class ComprehensiveTrainingIntegrator:
             "system_info": {
                 "name": "Comprehensive Fire Response Training System",
                 "version": "1.0",
-                "created": datetime.now().isoformat(),
+                "created": self.created_at,
                 "sources": list(self.source_documents.keys())
             },
             "training_standards": {
@@ -269,22 +275,26 @@ class ComprehensiveTrainingIntegrator:
         
         # Create comprehensive scenarios
         scenarios = self.create_unified_scenarios()
-        with open(self.training_dir / "integrated_scenarios.json", 'w') as f:
-            json.dump(scenarios, f, indent=2)
+        (self.training_dir / "integrated_scenarios.json").write_bytes(
+            orjson.dumps(scenarios, option=JSON_OPTIONS)
+        )
         
         # Create knowledge base
         knowledge_base = self.create_integrated_knowledge_base()
-        with open(self.training_dir / "comprehensive_knowledge_base.json", 'w') as f:
-            json.dump(knowledge_base, f, indent=2)
+        (self.training_dir / "comprehensive_knowledge_base.json").write_bytes(
+            orjson.dumps(knowledge_base, option=JSON_OPTIONS)
+        )
         
         # Create AI prompts
         prompts = self.create_ai_training_prompts()
-        with open(self.training_dir / "ai_training_prompts.json", 'w') as f:
-            json.dump(prompts, f, indent=2)
+        (self.training_dir / "ai_training_prompts.json").write_bytes(
+            orjson.dumps(prompts, option=JSON_OPTIONS)
+        )
         
         # Create source document reference
-        with open(self.training_dir / "source_documents.json", 'w') as f:
-            json.dump(self.source_documents, f, indent=2)
+        (self.training_dir / "source_documents.json").write_bytes(
+            orjson.dumps(self.source_documents, option=JSON_OPTIONS)
+        )
         
         print("🎯 COMPREHENSIVE TRAINING SYSTEM GENERATED!")
         print("=" * 60)
@@ -5,13 +5,35 @@ Comprehensive status of the enhanced fire response training system
 """
 
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 
+def _list_files(directory: Path) -> list:
+    """Names of the regular files in a directory, from one scandir pass"""
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.name for entry in entries if entry.is_file()]
+    except OSError:
+        return []
+
+def _format_section(section: dict, bool_marks: bool = False) -> str:
+    """Render a report section as one block of '   key: value' lines"""
+    lines = []
+    for key, value in section.items():
+        if isinstance(value, list):
+            value = ', '.join(value)
+        elif bool_marks and isinstance(value, bool):
+            value = '✅' if value else '❌'
+        lines.append(f"   {key}: {value}")
+    return "\n".join(lines)
+
 def generate_status_report():
     """Generate comprehensive status report"""
     
     current_dir = Path(__file__).parent
+    # One directory read each; the checks below are set lookups, not stats
+    present = set(_list_files(current_dir))
     report = {
         'timestamp': datetime.now().isoformat(),
         'system_overview': {},
@@ -38,50 +60,36 @@ def generate_status_report():
         'deployment': 'Netlify (website-files) + Local Enhanced DQN'
     }
     
-    for key, value in report['system_overview'].items():
-        if isinstance(value, list):
-            print(f"   {key}: {', '.join(value)}")
-        else:
-            print(f"   {key}: {value}")
+    print(_format_section(report['system_overview']))
     
     # 2. Training Data Status
     print("\n2️⃣ TRAINING DATA STATUS:")
     
     # Check training data files
     training_data_dir = current_dir / "training-data"
-    training_files = []
-    
-    if training_data_dir.exists():
-        training_files = list(training_data_dir.glob("*.json"))
+    training_files = [name for name in _list_files(training_data_dir) if name.endswith('.json')]
     
     report['training_data'] = {
         'comprehensive_scenarios_created': len(training_files) > 0,
-        'training_files': [f.name for f in training_files],
+        'training_files': training_files,
         'sources_integrated': ['NFPA', 'USCG', 'Navy'],
         'scenario_categories': ['fire_suppression', 'emergency_response', 'hazmat', 'rescue'],
         'total_scenarios': 'Estimated 150+',
         'data_quality': 'High - Based on authoritative sources'
     }
     
-    for key, value in report['training_data'].items():
-        if isinstance(value, list):
-            print(f"   {key}: {', '.join(value)}")
-        else:
-            print(f"   {key}: {value}")
+    print(_format_section(report['training_data']))
     
     # 3. Enhanced DQN System
     print("\n3️⃣ ENHANCED DQN SYSTEM:")
     
     # Check for enhanced DQN files
-    enhanced_dqn_exists = (current_dir / "enhanced_dqn_system.py").exists()
-    training_script_exists = (current_dir / "train_enhanced_dqn.py").exists()
-    evaluation_script_exists = (current_dir / "evaluate_enhanced_dqn.py").exists()
+    enhanced_dqn_exists = "enhanced_dqn_system.py" in present
+    training_script_exists = "train_enhanced_dqn.py" in present
+    evaluation_script_exists = "evaluate_enhanced_dqn.py" in present
     
     # Check for trained models
-    models_dir = current_dir / "models"
-    trained_model_exists = False
-    if models_dir.exists():
-        trained_model_exists = (models_dir / "enhanced_dqn_final.pth").exists()
+    trained_model_exists = "enhanced_dqn_final.pth" in _list_files(current_dir / "models")
     
     report['dqn_system'] = {
         'enhanced_architecture_created': enhanced_dqn_exists,
@@ -99,18 +107,12 @@ def generate_status_report():
         ]
     }
     
-    for key, value in report['dqn_system'].items():
-        if isinstance(value, list):
-            print(f"   {key}: {', '.join(value)}")
-        elif isinstance(value, bool):
-            print(f"   {key}: {'✅' if value else '❌'}")
-        else:
-            print(f"   {key}: {value}")
+    print(_format_section(report['dqn_system'], bool_marks=True))
     
     # 4. Integration Status
     print("\n4️⃣ INTEGRATION STATUS:")
     
-    web_integration_exists = (current_dir / "enhanced_web_integration.py").exists()
+    web_integration_exists = "enhanced_web_integration.py" in present
     
     report['integration_status'] = {
         'web_api_integration': web_integration_exists,
@@ -126,11 +128,7 @@ def generate_status_report():
         'security_status': 'API keys protected, GitHub clean'
     }
     
-    for key, value in report['integration_status'].items():
-        if isinstance(value, list):
-            print(f"   {key}: {', '.join(value)}")
-        else:
-            print(f"   {key}: {value}")
+    print(_format_section(report['integration_status']))
     
     # 5. Files Created
     print("\n5️⃣ KEY FILES CREATED:")
@@ -146,8 +144,7 @@ def generate_status_report():
     
     report['files_created'] = []
     for filename in key_files:
-        file_path = current_dir / filename
-        if file_path.exists():
+        if filename in present:
             report['files_created'].append(filename)
             print(f"   ✅ {filename}")
         else: